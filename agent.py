@@ -1,35 +1,139 @@
 """
 Simple Q-Learning Agent for Hunter Assassin Game
-Q-table gardée uniquement en mémoire (dans le code)
+Q-table en mémoire, sauvegardée sur disque (qtable.npz) entre deux lancements
 """
-
+import os
+from collections import deque
+from typing import Tuple
 
 import numpy as np
-from typing import Tuple
-import random
 import arcade
+import config
+from utils_numba import njit
+
+# Fichier de sauvegarde par défaut de la Q-table
+QTABLE_PATH = "qtable.npz"
+
+# Cadence d'affichage du test: 1 action toutes les 3 frames à 60 FPS (20 Hz)
+TEST_UPDATE_INTERVAL = 3 / 60
+
+
+@njit(cache=True, fastmath=True)
+def _q_update(qtable, sx, sy, actions, rewards, nsx, nsy, dones, n, alpha, gamma):
+    """
+    Règle du Q-learning sur les n premières transitions, dans l'ordre (compilée par Numba).
+
+    Appliquer les transitions une à une, comme en ligne, fait qu'un lot donne
+    exactement la même Q-table que la même suite de mises à jour avec batch_size=1.
+    """
+    for i in range(n):
+        x, y, action = sx[i], sy[i], actions[i]
+        nx, ny = nsx[i], nsy[i]
+        cur = qtable[x, y, action]
+        if dones[i]:
+            max_next = 0.0
+        else:
+            max_next = max(qtable[nx, ny, 0], qtable[nx, ny, 1],
+                           qtable[nx, ny, 2], qtable[nx, ny, 3])
+        qtable[x, y, action] = cur + alpha * (rewards[i] + gamma * max_next - cur)
+
+
+@njit(cache=True)
+def _choose_action(qtable, x, y, epsilon, coin, rand_act):
+    """
+    Epsilon-greedy sur une ligne de la Q-table (compilée par Numba).
+
+    Une ligne dont toutes les valeurs sont égales (état jamais vu) n'a pas de
+    meilleure action: on tire au hasard, comme pour l'exploration, au lieu de
+    renvoyer toujours l'action 0.
+    """
+    if coin < epsilon:
+        return int(rand_act)
+    best = 0
+    best_q = qtable[x, y, 0]
+    tied = True
+    for a in range(1, qtable.shape[2]):
+        q = qtable[x, y, a]
+        if q != best_q:
+            tied = False
+        if q > best_q:
+            best_q = q
+            best = a
+    if tied:
+        return int(rand_act)
+    return best
+
 
 class SimpleAgent:
-    def __init__(self):
-        """Initialiser l'agent simple."""
-        # Q-table en mémoire: dictionnaire {état: [Q-values pour chaque action]}
-        # 4 actions possibles: haut, bas, gauche, droite
-        self.qtable = {}
+    def __init__(self, batch_size: int = 64, num_episodes: int = None):
+        """
+        Initialiser l'agent simple.
+
+        Args:
+            batch_size: nombre de transitions accumulées avant une mise à jour
+                groupée de la Q-table (1 = Q-learning en ligne)
+            num_episodes: si connu, pré-calcule la trajectoire d'epsilon
+        """
+        # Q-table en mémoire: tableau dense [grid_x, grid_y, action]
+        # 16x16 états, 4 actions possibles: haut, bas, gauche, droite
+        self.qtable = np.zeros((16, 16, 4), dtype=np.float32)
 
         # Paramètres d'apprentissage
-        self.alpha = 0.1     # Learning rate
-        self.gamma = 0.95    # Discount factor
+        # alpha/gamma en float32 comme la Q-table (pas de promotion en float64)
+        self.alpha = np.float32(0.1)    # Learning rate
+        self.gamma = np.float32(0.95)   # Discount factor
         self.epsilon = 1.0   # Exploration initiale
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
 
+        # Trajectoire d'epsilon (suite géométrique bornée par epsilon_min)
+        self._epsilon_sched = None
+        if num_episodes:
+            decays = self.epsilon_decay ** np.arange(1, num_episodes + 1, dtype=np.float32)
+            self._epsilon_sched = np.maximum(self.epsilon_min, self.epsilon * decays)
+
+        # Tirages aléatoires pré-calculés par blocs (exploration epsilon-greedy)
+        self._rand_buf_size = 4096
+        self._rand_idx = 0
+        self._refill_random_buffer()
+
+        # Buffer d'expérience pré-alloué (une colonne par champ)
+        self.batch_size = max(1, batch_size)
+        b = self.batch_size
+        self.buf_sx = np.empty(b, np.int8)
+        self.buf_sy = np.empty(b, np.int8)
+        self.buf_a = np.empty(b, np.int8)
+        self.buf_r = np.empty(b, np.float32)
+        self.buf_nsx = np.empty(b, np.int8)
+        self.buf_nsy = np.empty(b, np.int8)
+        self.buf_done = np.empty(b, np.bool_)
+        self._buf_i = 0
+
+        # Buffers réutilisés par get_state (position joueur juste après les rayons)
+        self._pos_slice = slice(config.NUM_RAYS, config.NUM_RAYS + 2)
+        self._pos_buf = np.empty(2, np.float32)
+        self._state_buf = np.empty(2, np.int32)
+
         # Statistiques
         self.episodes = 0
         self.total_reward = 0
-        self.episode_rewards = []
+        # Historique des rewards: buffer float32 agrandi par doublement
+        self._rewards = np.empty(1024, np.float32)
+        self._n = 0
+
+        # Statistiques glissantes en O(1) (fenêtre des 100 derniers épisodes)
+        self._reward_sum = 0.0
+        self._reward_max = -float('inf')
+        self._recent = deque(maxlen=100)
+        self._recent_sum = 0.0
 
         print("Agent initialisé (4 actions, Q-table vide en mémoire)")
 
+    @property
+    def episode_rewards(self) -> np.ndarray:
+        """Rewards de tous les épisodes terminés (vue sur le buffer interne)."""
+        return self._rewards[:self._n]
+
     def get_state(self, observation: np.ndarray) -> Tuple[int, int]:
         """
         Convertir l'observation en état discret basé sur la position du joueur.
@@ -40,68 +144,103 @@ class SimpleAgent:
         Returns:
             état sous forme de tuple (x, y)
         """
-        num_rays = 16
-        player_x = observation[num_rays]      # Position X normalisée (0-1)
-        player_y = observation[num_rays + 1]  # Position Y normalisée (0-1)
+        return tuple(self.get_state_inplace(observation, self._state_buf).tolist())
 
-        # Convertir en coordonnées grille 16x16
-        grid_x = int(player_x * 16)
-        grid_y = int(player_y * 16)
+    def get_state_inplace(self, observation: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Variante sans allocation de get_state: écrit (grid_x, grid_y) dans `out`.
+
+        Args:
+            observation: observation brute du jeu
+            out: tableau int32 de taille 2 pré-alloué par l'appelant
 
+        Returns:
+            `out`
+        """
+        # Position (x, y) normalisée (0-1) -> coordonnées grille 16x16
+        np.multiply(observation[self._pos_slice], 16, out=self._pos_buf)
         # Bornes de sécurité
-        grid_x = max(0, min(15, grid_x))
-        grid_y = max(0, min(15, grid_y))
+        np.clip(self._pos_buf, 0, 15, out=self._pos_buf)
+        out[:] = self._pos_buf
+        return out
 
-        return (grid_x, grid_y)
+    def _refill_random_buffer(self):
+        """Pré-tirer un bloc de pièces d'exploration et d'actions aléatoires."""
+        n = self._rand_buf_size
+        self._coins = np.random.random(n).astype(np.float32)
+        self._rand_actions = np.random.randint(0, 4, size=n, dtype=np.int8)
+        self._rand_idx = 0
 
     def choose_action(self, state: Tuple[int, int]) -> int:
         """
         Choisir une action selon la stratégie epsilon-greedy.
         Actions: 0=Up, 1=Down, 2=Left, 3=Right
         """
-        num_actions = 4
+        if self._rand_idx >= self._rand_buf_size:
+            self._refill_random_buffer()
+        i = self._rand_idx
+        self._rand_idx = i + 1
 
-        # Exploration
-        if random.random() < self.epsilon:
-            return random.randint(0, num_actions - 1)
-
-        # Exploitation
-        if state in self.qtable:
-            return int(np.argmax(self.qtable[state]))
-        else:
-            return random.randint(0, num_actions - 1)
+        # Exploration ou exploitation (indexation directe, pas de hash)
+        return _choose_action(self.qtable, state[0], state[1], self.epsilon,
+                              self._coins[i], self._rand_actions[i])
 
     def learn(self, state: Tuple[int, int], action: int, reward: float, next_state: Tuple[int, int], done: bool):
         """
         Met à jour la Q-table selon la règle du Q-learning.
+        Les transitions sont stockées puis appliquées par lots de batch_size.
         """
-        num_actions = 4
-
-        if state not in self.qtable:
-            self.qtable[state] = [0.0] * num_actions
-        if next_state not in self.qtable:
-            self.qtable[next_state] = [0.0] * num_actions
+        self.total_reward += reward
 
-        current_q = self.qtable[state][action]
-        max_next_q = 0 if done else max(self.qtable[next_state])
+        i = self._buf_i
+        self.buf_sx[i], self.buf_sy[i] = state
+        self.buf_a[i] = action
+        self.buf_r[i] = reward
+        self.buf_nsx[i], self.buf_nsy[i] = next_state
+        self.buf_done[i] = done
+        self._buf_i = i + 1
 
-        # Q-learning update
-        new_q = current_q + self.alpha * (reward + self.gamma * max_next_q - current_q)
-        self.qtable[state][action] = new_q
+        if self._buf_i == self.batch_size:
+            self._flush()
 
-        self.total_reward += reward
+    def _flush(self):
+        """Appliquer en un seul appel compilé les transitions du buffer."""
+        if self._buf_i == 0:
+            return
+        _q_update(self.qtable, self.buf_sx, self.buf_sy, self.buf_a, self.buf_r,
+                  self.buf_nsx, self.buf_nsy, self.buf_done, self._buf_i,
+                  self.alpha, self.gamma)
+        self._buf_i = 0
 
     def end_episode(self, episode_reward: float):
         """
         Appelé à la fin d’un épisode.
         """
+        self._flush()
         self.episodes += 1
-        self.episode_rewards.append(episode_reward)
-        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+        self._record_reward(episode_reward)
+        if self._epsilon_sched is not None and self.episodes <= len(self._epsilon_sched):
+            self.epsilon = float(self._epsilon_sched[self.episodes - 1])
+        else:
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+    def _record_reward(self, episode_reward: float):
+        """Ajouter le reward d'un épisode à l'historique et aux statistiques glissantes."""
+        if self._n == len(self._rewards):
+            self._rewards = np.resize(self._rewards, len(self._rewards) * 2)
+        self._rewards[self._n] = episode_reward
+        self._n += 1
+
+        self._reward_sum += episode_reward
+        self._reward_max = max(self._reward_max, episode_reward)
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_sum -= self._recent[0]
+        self._recent.append(episode_reward)
+        self._recent_sum += episode_reward
 
     def get_stats(self) -> dict:
         """Retourne les statistiques d'entraînement."""
-        if not self.episode_rewards:
+        if self.episodes == 0:
             return {
                 "episodes": 0,
                 "qtable_size": 0,
@@ -110,34 +249,65 @@ class SimpleAgent:
                 "recent_avg": 0
             }
 
-        recent_window = min(100, len(self.episode_rewards))
-        recent_rewards = self.episode_rewards[-recent_window:]
-
         return {
             "episodes": self.episodes,
-            "qtable_size": len(self.qtable),
-            "avg_reward": np.mean(self.episode_rewards),
-            "best_reward": max(self.episode_rewards),
-            "recent_avg": np.mean(recent_rewards)
+            "qtable_size": self.num_states(),
+            "avg_reward": self._reward_sum / self.episodes,
+            "best_reward": self._reward_max,
+            "recent_avg": self._recent_sum / len(self._recent)
         }
 
+    def save(self, path: str = QTABLE_PATH):
+        """Sauvegarder la Q-table et l'état d'apprentissage (format binaire NumPy)."""
+        self._flush()
+        np.savez(path,
+                 qtable=self.qtable,
+                 epsilon=self.epsilon,
+                 episodes=self.episodes,
+                 episode_rewards=self.episode_rewards)
+        print(f"Q-table sauvegardée dans {path}")
+
+    @classmethod
+    def load(cls, path: str = QTABLE_PATH) -> 'SimpleAgent':
+        """Recharger un agent sauvegardé avec save()."""
+        agent = cls()
+        with np.load(path) as data:
+            agent.qtable[...] = data["qtable"]
+            agent.epsilon = float(data["epsilon"])
+            agent.episodes = int(data["episodes"])
+            for episode_reward in data["episode_rewards"].tolist():
+                agent._record_reward(episode_reward)
+        print(f"Q-table chargée depuis {path} ({agent.num_states()} états)")
+        return agent
+
+    def num_states(self) -> int:
+        """Nombre d'états déjà visités (au moins une Q-value non nulle)."""
+        return int(np.count_nonzero(self.qtable.any(axis=2)))
+
     def show_qtable(self):
         """Afficher un extrait de la Q-table."""
         print("\n" + "=" * 60)
         print("Q-TABLE (extrait)")
         print("=" * 60)
 
-        if not self.qtable:
+        visited = self.qtable.any(axis=2)
+        num_visited = self.num_states()
+        if num_visited == 0:
             print("Q-table vide!")
             return
 
-        for i, (state, q_values) in enumerate(self.qtable.items()):
-            if i >= 10:
-                print(f"... et {len(self.qtable) - 10} autres états")
+        shown = 0
+        for state, is_visited in np.ndenumerate(visited):
+            if not is_visited:
+                continue
+            if shown >= 10:
+                print(f"... et {num_visited - 10} autres états")
                 break
+            q_values = self.qtable[state]
             best_action = int(np.argmax(q_values))
-            best_value = max(q_values)
+            best_value = float(q_values.max())
             print(f"État {state}: meilleure action={best_action}, Q={best_value:.2f}")
+            shown += 1
 
         print("=" * 60 + "\n")
 
@@ -160,44 +330,65 @@ def train_simple(num_episodes: int = 100, render: bool = True):
 
     # Créer environnement et agent
     env = HunterAssassinEnv(render_mode=render)
-    agent = SimpleAgent()
+    agent = SimpleAgent(num_episodes=num_episodes)
 
     test_window = TestWindow(agent)
 
     # Fonction de mise à jour appelée par arcade
     def on_update(delta_time):
         test_window.update()
-        test_window.env.on_draw()
 
     # Lancer la boucle arcade
-    arcade.schedule(on_update, 1 / 60)  # 60 FPS
+    arcade.schedule(on_update, TEST_UPDATE_INTERVAL)  # 20 Hz
     arcade.run()
 
+    # Méthodes liées en variables locales pour la boucle chaude
+    choose_action = agent.choose_action
+    learn = agent.learn
+    get_state = agent.get_state
+    step = env.step
+    draw = env.on_draw
+    flip = env.flip
+
     for episode in range(num_episodes):
         # Reset
         obs = env.reset()
-        state = agent.get_state(obs)
+        state = get_state(obs)
 
         episode_reward = 0
         steps = 0
         done = False
 
-        while not done:
-            # Choisir et exécuter action
-            action = agent.choose_action(state)
-            next_obs, reward, done, info = env.step(action)
-            next_state = agent.get_state(next_obs)
+        # Deux variantes de la boucle pour ne pas tester `render` à chaque pas
+        if render:
+            while not done:
+                # Choisir et exécuter action
+                action = choose_action(state)
+                next_obs, reward, done, info = step(action)
+                next_state = get_state(next_obs)
+
+                # Apprendre
+                learn(state, action, reward, next_state, done)
 
-            # Apprendre
-            agent.learn(state, action, reward, next_state, done)
+                state = next_state
+                episode_reward += reward
+                steps += 1
 
-            state = next_state
-            episode_reward += reward
-            steps += 1
+                draw()
+                flip()
+        else:
+            while not done:
+                # Choisir et exécuter action
+                action = choose_action(state)
+                next_obs, reward, done, info = step(action)
+                next_state = get_state(next_obs)
 
-            if render:
-                env.on_draw()
-                env.flip()
+                # Apprendre
+                learn(state, action, reward, next_state, done)
+
+                state = next_state
+                episode_reward += reward
+                steps += 1
 
         # Fin épisode
         agent.end_episode(episode_reward)
@@ -208,7 +399,7 @@ def train_simple(num_episodes: int = 100, render: bool = True):
                   f"Reward: {episode_reward:6.1f} | "
                   f"Steps: {steps:3d} | "
                   f"Epsilon: {agent.epsilon:.3f} | "
-                  f"États Q: {len(agent.qtable)}")
+                  f"États Q: {agent.num_states()}")
 
     # Afficher statistiques finales
     stats = agent.get_stats()
@@ -282,22 +473,20 @@ class TestWindow:
 
     def update(self):
         if self.done:
-            self.total_reward += self.episode_reward
+            # Pause entre deux épisodes: rien ne change, rien à redessiner
             self.frame_counter += 1
-            if self.frame_counter > 5:  # quelques frames pour pause
+            if self.frame_counter > 2:  # quelques ticks pour pause
                 self._start_episode()
             return
 
-        # Ralentir l'agent pour qu'on puisse le voir (1 action toutes les 3 frames)
-        self.frame_counter += 1
-        if self.frame_counter % 3 != 0:
-            return
-
-        # Choisir et exécuter action
+        # Choisir et exécuter action (une par appel, à TEST_UPDATE_INTERVAL)
         action = self.agent.choose_action(self.state)
         next_obs, reward, self.done, info = self.env.step(action)
         next_state = self.agent.get_state(next_obs)
 
+        # Redessiner uniquement quand l'état du jeu a changé
+        self.env.on_draw()
+
         self.state = next_state
         self.episode_reward += reward
         self.steps += 1
@@ -321,7 +510,8 @@ def test_simple(agent: SimpleAgent = None, num_episodes: int = 5):
     Tester l'agent entraîné (avec affichage).
 
     Args:
-        agent: agent déjà entraîné (ou None pour en créer un vide)
+        agent: agent déjà entraîné (ou None pour charger QTABLE_PATH s'il existe,
+            sinon créer un agent vide)
         num_episodes: nombre d'épisodes de test
     """
 
@@ -330,11 +520,13 @@ def test_simple(agent: SimpleAgent = None, num_episodes: int = 5):
     print("TEST AGENT SIMPLE")
     print("=" * 60 + "\n")
 
-    if agent is None:
+    if agent is None and os.path.exists(QTABLE_PATH):
+        agent = SimpleAgent.load(QTABLE_PATH)
+    elif agent is None:
         print("⚠ Aucun agent fourni, création d'un agent vide (non entraîné)")
         agent = SimpleAgent()
     else:
-        print(f"✓ Utilisation d'un agent entraîné ({len(agent.qtable)} états)")
+        print(f"✓ Utilisation d'un agent entraîné ({agent.num_states()} états)")
 
     # Mode exploitation pure (pas d'exploration)
     original_epsilon = agent.epsilon
@@ -346,10 +538,9 @@ def test_simple(agent: SimpleAgent = None, num_episodes: int = 5):
     # Fonction de mise à jour appelée par arcade
     def on_update(delta_time):
         test_window.update()
-        test_window.env.on_draw()
 
     # Lancer la boucle arcade
-    arcade.schedule(on_update, 1 / 60)  # 60 FPS
+    arcade.schedule(on_update, TEST_UPDATE_INTERVAL)  # 20 Hz
     arcade.run()
 
     # Restaurer epsilon
@@ -363,25 +554,27 @@ if __name__ == "__main__":
         if sys.argv[1] == "train":
             episodes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
             agent = train_simple(num_episodes=episodes, render=False)
+            agent.save(QTABLE_PATH)
 
             # Proposer de tester
-            print("\nVoulez-vous tester l'agent? (Il va perdre sa mémoire après)")
+            print("\nVoulez-vous tester l'agent?")
             response = input("Taper 'oui' pour tester: ")
             if response.lower() in ['oui', 'o', 'yes', 'y']:
                 test_simple(agent=agent, num_episodes=5)
 
         elif sys.argv[1] == "test":
-            print("⚠ Mode test sans entraînement préalable")
-            print("L'agent va jouer aléatoirement (Q-table vide)\n")
+            if not os.path.exists(QTABLE_PATH):
+                print("⚠ Mode test sans entraînement préalable")
+                print("L'agent va jouer aléatoirement (Q-table vide)\n")
             test_simple(num_episodes=5)
 
         else:
             print("Usage:")
             print("  python agent.py train [episodes]  # Entraîner")
-            print("  python agent.py test              # Tester (vide)")
+            print("  python agent.py test              # Tester (qtable.npz si présent)")
     else:
-        print("Agent Q-Learning Simple (Q-table en mémoire)")
+        print("Agent Q-Learning Simple (Q-table sauvegardée dans qtable.npz)")
         print("\nUsage:")
         print("  python agent.py train 100   # Entraîner 100 épisodes")
         print("  python agent.py train 500   # Entraîner 500 épisodes")
-        print("  python agent.py test        # Tester agent vide")
\ No newline at end of file
+        print("  python agent.py test        # Tester l'agent sauvegardé")
\ No newline at end of file
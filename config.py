@@ -1,6 +1,7 @@
 """
 Game configuration settings for Hunter Assassin
 """
+import numpy as np
 
 # Window settings
 TILE_SIZE = 56  # Pixels per tile
@@ -38,6 +39,7 @@ GUARD_CHASE_SPEED = 1.5
 GUARD_PATROL_PAUSE_TIME = 90  # Frames
 GUARD_ALERT_COLOR = (255, 150, 0)  # Orange when alerted
 GUARD_DETECTION_TIME = 0.3  # Seconds to full detection
+GUARD_VISION_PERIOD = 3  # Frames between two vision checks (result reused in between)
 GUARD_SHOOT_RANGE = TILE_SIZE * 5  # Can shoot within 5 tiles
 NUM_GUARDS = 4  # Will be overridden by JSON map
 
@@ -48,6 +50,7 @@ BULLET_SPEED = 8.0
 BULLET_SIZE = 4
 BULLET_COLOR = (255, 255, 0)  # Yellow
 BULLET_LIFETIME = 120  # Frames before bullet disappears
+MAX_BULLETS = 64  # Initial BulletPool capacity (grows if exceeded)
 
 # Obstacle settings
 OBSTACLE_COLOR = (80, 80, 100)  # Dark gray
@@ -86,6 +89,19 @@ ACTIONS = {
 }
 NUM_ACTIONS = len(ACTIONS)
 
+# Same actions as a (dx, dy) lookup table indexed by action id (row 0 = stay)
+ACTION_DELTAS = np.zeros((max(ACTIONS) + 1, 2), dtype=np.int8)
+for _action, _delta in ACTIONS.items():
+    ACTION_DELTAS[_action] = _delta
+del _action, _delta
+
 # State observation settings
 NUM_RAYS = 16  # Number of ray casts for distance sensing
 RAY_MAX_DISTANCE = 300
+# Return a zero observation on the final step of an episode instead of casting
+# rays for it; only for agents that ignore next_obs when done is True
+ZERO_TERMINAL_OBSERVATION = False
+# Storage type of observations: np.float32 (default), np.float16, or np.int8
+# holding round(value * 127) since every feature lies in [-1, 1]; the smaller
+# types cut replay-buffer memory, agents must scale int8 back by 1 / 127
+OBSERVATION_DTYPE = np.float32
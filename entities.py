@@ -1,16 +1,42 @@
 """
-Game entity classes: Player, Enemy, Obstacle, and Bullet
+Game entity classes: Player, Enemy, Obstacle, Bullet and BulletPool
 """
 import arcade
+import arcade.shape_list
 import random
 import math
+import itertools
+import numpy as np
 from typing import List, Tuple, Optional
 import config
-from utils import (has_line_of_sight, get_distance, get_angle_to_point, 
-                   is_point_in_cone, check_collision_circles, cast_ray)
+from utils import (get_distance_sq, get_angle_to_point, 
+                   check_collision_circles)
+from utils_numba import line_of_sight_nb, step_toward_nb
 from pathfinding import find_path
 from player_animation import AnimatedPlayerSprite
 
+# Pre-rolled uniform [0, 1) samples for the enemy AI's random choices;
+# each enemy walks the shared stream from its own random offset
+RNG_STREAM_SIZE = 65536  # Power of two: wrap with a mask
+RNG_STREAM: List[float] = []
+
+
+def refill_rng_stream():
+    """
+    Re-roll RNG_STREAM (in place) from the current `random` state.
+    
+    Called on every environment reset, so seeding `random` before a run
+    makes the enemy AI reproducible like the rest of the game.
+    """
+    seed = random.getrandbits(64)
+    RNG_STREAM[:] = np.random.default_rng(seed).random(RNG_STREAM_SIZE).tolist()
+
+
+refill_rng_stream()
+
+# Every order in which a patrolling enemy can try the four adjacent tiles
+PATROL_MOVE_ORDERS = list(itertools.permutations([(0, 1), (0, -1), (1, 0), (-1, 0)]))
+
 
 class Obstacle(arcade.SpriteSolidColor):
     """Represents a wall/obstacle in the game."""
@@ -24,6 +50,24 @@ class Obstacle(arcade.SpriteSolidColor):
         self.width = width
         self.height = height
         self.custom_color = color
+        # Darker border for depth; obstacles are static so computed once
+        self.border_color = (max(0, color[0] - 20), max(0, color[1] - 20), max(0, color[2] - 20))
+    
+    def create_shapes(self) -> Tuple[arcade.shape_list.Shape, arcade.shape_list.Shape]:
+        """
+        Build the filled rectangle and border drawn by draw_colored(), for a
+        ShapeElementList that is uploaded once and drawn in a single call.
+        
+        Returns:
+            Tuple of (filled, outline) shapes
+        """
+        filled = arcade.shape_list.create_rectangle_filled(
+            self.center_x, self.center_y, self.width, self.height, self.custom_color
+        )
+        outline = arcade.shape_list.create_rectangle_outline(
+            self.center_x, self.center_y, self.width, self.height, self.border_color, 2
+        )
+        return filled, outline
     
     def draw_colored(self):
         """Draw the obstacle as a colored rectangle with subtle border."""
@@ -37,13 +81,12 @@ class Obstacle(arcade.SpriteSolidColor):
         )
         
         # Draw subtle border for depth
-        border_color = tuple(max(0, c - 20) for c in self.custom_color[:3])
         arcade.draw_lrbt_rectangle_outline(
             self.center_x - self.width / 2,
             self.center_x + self.width / 2,
             self.center_y - self.height / 2,
             self.center_y + self.height / 2,
-            border_color, 2
+            self.border_color, 2
         )
 
 
@@ -52,27 +95,39 @@ class Bullet:
     Bullet/projectile fired by enemies.
     """
     
-    def __init__(self, x: float, y: float, angle: float, shooter_id: int):
+    __slots__ = ('center_x', 'center_y', 'speed', 'radius', 'radius_sq',
+                 'color', 'lifetime', 'age', 'active', 'shooter_id',
+                 'velocity_x', 'velocity_y')
+    
+    # Config values read every frame, bound once at import
+    SCREEN_WIDTH = config.SCREEN_WIDTH
+    SCREEN_HEIGHT = config.SCREEN_HEIGHT
+    # Trail length (10 px) per unit of velocity
+    TRAIL_SCALE = 10 / config.BULLET_SPEED
+    
+    def __init__(self, x: float, y: float, dir_x: float, dir_y: float, shooter_id: int):
         self.center_x = x
         self.center_y = y
-        self.angle = angle  # Direction in degrees
         self.speed = config.BULLET_SPEED
         self.radius = config.BULLET_SIZE
+        self.radius_sq = self.radius * self.radius
         self.color = config.BULLET_COLOR
         self.lifetime = config.BULLET_LIFETIME
         self.age = 0
         self.active = True
         self.shooter_id = shooter_id  # ID of enemy that shot this
         
-        # Calculate velocity
-        angle_rad = math.radians(angle)
-        self.velocity_x = math.cos(angle_rad) * self.speed
-        self.velocity_y = math.sin(angle_rad) * self.speed
+        # Velocity straight from the unit aim direction (dir_x, dir_y), no trig
+        self.velocity_x = dir_x * self.speed
+        self.velocity_y = dir_y * self.speed
     
-    def update(self, obstacles: List['Obstacle']) -> bool:
+    def update(self, obstacles: 'ObstacleIndex') -> bool:
         """
         Update bullet position and check for collisions.
         
+        Args:
+            obstacles: Broadphase index of the level's obstacles
+        
         Returns:
             True if bullet should be removed
         """
@@ -89,18 +144,18 @@ class Bullet:
         new_y = self.center_y + self.velocity_y
         
         # Check screen boundaries
-        if (new_x < 0 or new_x > config.SCREEN_WIDTH or 
-            new_y < 0 or new_y > config.SCREEN_HEIGHT):
+        if (new_x < 0 or new_x > self.SCREEN_WIDTH or 
+            new_y < 0 or new_y > self.SCREEN_HEIGHT):
             self.active = False
             return True
         
-        # Check obstacle collisions
-        for obstacle in obstacles:
-            closest_x = max(obstacle.left, min(new_x, obstacle.right))
-            closest_y = max(obstacle.bottom, min(new_y, obstacle.top))
+        # Check collisions with nearby obstacles
+        # Offsets to the closest point of each box, without a call per obstacle
+        for left, right, bottom, top in obstacles.query(new_x, new_y, self.radius):
+            ddx = new_x - left if new_x < left else (new_x - right if new_x > right else 0.0)
+            ddy = new_y - bottom if new_y < bottom else (new_y - top if new_y > top else 0.0)
             
-            dist = get_distance(new_x, new_y, closest_x, closest_y)
-            if dist < self.radius:
+            if ddx * ddx + ddy * ddy < self.radius_sq:
                 self.active = False
                 return True
         
@@ -113,9 +168,9 @@ class Bullet:
         if not self.active or not player.alive:
             return False
         
-        distance = get_distance(self.center_x, self.center_y,
-                               player.center_x, player.center_y)
-        return distance < (self.radius + player.radius)
+        reach = self.radius + player.radius
+        return get_distance_sq(self.center_x, self.center_y,
+                               player.center_x, player.center_y) < reach * reach
     
     def draw_colored(self):
         """Draw the bullet."""
@@ -128,9 +183,8 @@ class Bullet:
             )
             
             # Draw motion trail
-            trail_length = 10
-            trail_x = self.center_x - self.velocity_x / self.speed * trail_length
-            trail_y = self.center_y - self.velocity_y / self.speed * trail_length
+            trail_x = self.center_x - self.velocity_x * self.TRAIL_SCALE
+            trail_y = self.center_y - self.velocity_y * self.TRAIL_SCALE
             arcade.draw_line(
                 self.center_x, self.center_y,
                 trail_x, trail_y,
@@ -138,11 +192,227 @@ class Bullet:
             )
 
 
+class BulletPool:
+    """
+    All live bullets stored as NumPy arrays (structure of arrays).
+
+    Bullets are updated in one vectorized pass per frame instead of one
+    Python loop over the obstacles per bullet.
+    """
+    
+    SCREEN_WIDTH = config.SCREEN_WIDTH
+    SCREEN_HEIGHT = config.SCREEN_HEIGHT
+    
+    def __init__(self, capacity: int = config.MAX_BULLETS):
+        self.speed = config.BULLET_SPEED
+        self.radius = config.BULLET_SIZE
+        self.color = config.BULLET_COLOR
+        self.trail_color = (*config.BULLET_COLOR[:3], 100)
+        self.lifetime = config.BULLET_LIFETIME
+        self._allocate(capacity)
+        # Circle sprites drawn in one batched call; created on first draw
+        # because headless training never renders
+        self._sprites: Optional[arcade.SpriteList] = None
+    
+    def _allocate(self, capacity: int):
+        self.pos_x = np.zeros(capacity, dtype=np.float32)
+        self.pos_y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.shooter_id = np.zeros(capacity, dtype=np.int64)
+        # Slots at or past this index are all inactive; update() only
+        # touches the prefix, through slice views instead of gathers
+        self.high_water = 0
+    
+    def _grow(self):
+        """Double the capacity, keeping existing bullets."""
+        old = (self.pos_x, self.pos_y, self.vx, self.vy,
+               self.age, self.active, self.shooter_id)
+        n = len(self.active)
+        self._allocate(n * 2)
+        for new, prev in zip((self.pos_x, self.pos_y, self.vx, self.vy,
+                              self.age, self.active, self.shooter_id), old):
+            new[:n] = prev
+        self.high_water = n
+    
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.active))
+    
+    def clear(self):
+        """Deactivate every bullet."""
+        self.active[:] = False
+        self.high_water = 0
+    
+    def spawn(self, x: float, y: float, dir_x: float, dir_y: float, shooter_id: int) -> int:
+        """
+        Fire a new bullet, recycling the first free slot.
+        
+        Args:
+            x, y: Starting position
+            dir_x, dir_y: Unit direction of travel
+            shooter_id: ID of the enemy that fired it
+        
+        Returns:
+            Index of the slot the bullet was written to
+        """
+        # First False in the mask: no temporary index array per shot
+        i = int(self.active.argmin())
+        if self.active[i]:
+            i = len(self.active)
+            self._grow()
+        self.pos_x[i] = x
+        self.pos_y[i] = y
+        self.vx[i] = dir_x * self.speed
+        self.vy[i] = dir_y * self.speed
+        self.age[i] = 0
+        self.active[i] = True
+        self.shooter_id[i] = shooter_id
+        self.high_water = max(self.high_water, i + 1)
+        return i
+    
+    def release(self, i: int):
+        """Return a bullet's slot to the pool."""
+        self.active[i] = False
+    
+    def update(self, obstacle_aabb: np.ndarray):
+        """
+        Advance every active bullet by one frame (same rules as Bullet.update).
+        
+        Args:
+            obstacle_aabb: (N, 4) array of obstacle (left, right, bottom, top)
+        """
+        n = self.high_water
+        if n == 0:
+            return
+        active = self.active[:n]
+        age = self.age[:n]
+        
+        # Whole-prefix arithmetic on views; inactive slots are masked out below
+        age += active
+        new_x = self.pos_x[:n] + self.vx[:n]
+        new_y = self.pos_y[:n] + self.vy[:n]
+        
+        # Activity, age and screen bounds as one mask; cheap, so done before collisions
+        alive = (active & (age < self.lifetime) &
+                 (new_x >= 0) & (new_x <= self.SCREEN_WIDTH) &
+                 (new_y >= 0) & (new_y <= self.SCREEN_HEIGHT))
+        
+        # Closest point of every obstacle to every surviving bullet: (bullets, obstacles)
+        if len(obstacle_aabb) and alive.any():
+            live = np.flatnonzero(alive)
+            bx = new_x[live, None]
+            by = new_y[live, None]
+            # Reuse the clip outputs for the offsets and squared distance
+            dx = np.clip(bx, obstacle_aabb[:, 0], obstacle_aabb[:, 1])
+            dy = np.clip(by, obstacle_aabb[:, 2], obstacle_aabb[:, 3])
+            np.subtract(bx, dx, out=dx)
+            np.subtract(by, dy, out=dy)
+            np.multiply(dx, dx, out=dx)
+            np.multiply(dy, dy, out=dy)
+            np.add(dx, dy, out=dx)
+            alive[live] = (dx >= self.radius * self.radius).all(axis=1)
+        
+        active[:] = alive
+        np.copyto(self.pos_x[:n], new_x, where=alive)
+        np.copyto(self.pos_y[:n], new_y, where=alive)
+        
+        # Shrink the prefix past trailing dead slots
+        live = np.flatnonzero(alive)
+        self.high_water = int(live[-1]) + 1 if len(live) else 0
+    
+    def check_hit_player(self, player: 'Player') -> bool:
+        """
+        Check if any bullet hit the player; the bullet that hit is deactivated.
+        
+        Returns:
+            True if the player was hit
+        """
+        if not player.alive:
+            return False
+        # Only the prefix can hold live bullets
+        idx = np.flatnonzero(self.active[:self.high_water])
+        if len(idx) == 0:
+            return False
+        
+        dx = self.pos_x[idx] - player.center_x
+        dy = self.pos_y[idx] - player.center_y
+        reach = self.radius + player.radius
+        hits = np.flatnonzero(dx * dx + dy * dy < reach * reach)
+        if len(hits) == 0:
+            return False
+        self.release(idx[hits[0]])
+        return True
+    
+    def draw_colored(self):
+        """Draw all active bullets with their motion trail."""
+        idx = np.flatnonzero(self.active)
+        if len(idx) == 0 and self._sprites is None:
+            return
+        if self._sprites is None:
+            self._sprites = arcade.SpriteList()
+        
+        xs = self.pos_x[idx]
+        ys = self.pos_y[idx]
+        draw_circle_batch(self._sprites, xs.tolist(), ys.tolist(), self.radius, self.color)
+        
+        # Motion trails: every segment in one draw_lines call
+        if len(idx):
+            segments = np.empty((2 * len(idx), 2), dtype=np.float32)
+            segments[0::2, 0] = xs
+            segments[0::2, 1] = ys
+            segments[1::2, 0] = xs - self.vx[idx] * Bullet.TRAIL_SCALE
+            segments[1::2, 1] = ys - self.vy[idx] * Bullet.TRAIL_SCALE
+            arcade.draw_lines(segments.tolist(), self.trail_color, 2)
+
+
+def draw_circle_batch(sprites: arcade.SpriteList, xs: List[float], ys: List[float],
+                      radius: float, color, colors: Optional[List] = None):
+    """
+    Draw same-sized filled circles with a single SpriteList draw call.
+    
+    Sprites are reused across frames: one per circle, spares are hidden.
+    
+    Args:
+        sprites: SpriteList owned by the caller, only used for these circles
+        xs, ys: Circle centers
+        radius: Circle radius
+        color: Fill color
+        colors: Optional per-circle tints, multiplied with color (pass white
+            as color for exact per-circle colors)
+    """
+    while len(sprites) < len(xs):
+        sprites.append(arcade.SpriteCircle(radius, color))
+    for k, sprite in enumerate(sprites):
+        if k < len(xs):
+            sprite.position = (xs[k], ys[k])
+            if colors is not None:
+                sprite.color = colors[k]
+            sprite.visible = True
+        else:
+            sprite.visible = False
+    sprites.draw()
+
+
 class Player(arcade.SpriteSolidColor):
     """
     Player character controlled by user or RL agent.
     """
     
+    # Slots for the fields added on top of the sprite. arcade's PymunkMixin
+    # still provides a __dict__, so this speeds up attribute access rather
+    # than saving memory, and a field missing here would silently land in
+    # that dict instead of failing: tests/test_slots.py checks the list
+    __slots__ = ('radius', 'speed', 'alive', 'kills', 'damage_dealt', 'animated_sprite',
+                 'is_attacking', 'attack_target', 'target_position', 'path_waypoints',
+                 'current_waypoint_idx', 'movement_threshold', 'movement_threshold_sq',
+                 'last_move_dx', 'last_move_dy')
+    
+    ATTACK_RANGE = getattr(config, 'PLAYER_MELEE_RANGE', getattr(config, 'PLAYER_ATTACK_RANGE', 30))
+    ATTACK_RANGE_SQ = ATTACK_RANGE * ATTACK_RANGE
+    TILE_SIZE = config.TILE_SIZE
+    
     def __init__(self, x: float, y: float):
         super().__init__(config.PLAYER_SIZE * 2, config.PLAYER_SIZE * 2, config.PLAYER_COLOR)
         self.center_x = x
@@ -169,8 +439,9 @@ class Player(arcade.SpriteSolidColor):
         self.path_waypoints = []  # List of waypoints to follow
         self.current_waypoint_idx = 0  # Index of current waypoint
         self.movement_threshold = 8.0  # Stop when within 8 pixels of waypoint
+        self.movement_threshold_sq = self.movement_threshold * self.movement_threshold
         
-    def set_target(self, target_x: float, target_y: float, obstacles: List[Obstacle], 
+    def set_target(self, target_x: float, target_y: float, obstacles: 'ObstacleIndex', 
                    grid_width: int, grid_height: int, tile_size: int):
         """
         Set target position and calculate path using A* pathfinding.
@@ -181,6 +452,13 @@ class Player(arcade.SpriteSolidColor):
             grid_width, grid_height: Grid dimensions
             tile_size: Size of each tile
         """
+        # A re-click within half a tile of the current target keeps the path
+        # being followed (obstacles only change on reset, so it is still valid)
+        if self.target_position is not None and self.path_waypoints:
+            half_tile = tile_size / 2
+            if get_distance_sq(target_x, target_y, *self.target_position) < half_tile * half_tile:
+                return
+        
         self.target_position = (target_x, target_y)
         
         # Calculate path using A* with player's radius
@@ -207,7 +485,7 @@ class Player(arcade.SpriteSolidColor):
         self.path_waypoints = []
         self.current_waypoint_idx = 0
     
-    def update_movement(self, obstacles: List[Obstacle], screen_width: float, screen_height: float):
+    def update_movement(self, obstacles: 'ObstacleIndex', screen_width: float, screen_height: float):
         """
         Update pathfinding-based movement toward target.
         Follows waypoints from A* pathfinding algorithm.
@@ -229,10 +507,10 @@ class Player(arcade.SpriteSolidColor):
         waypoint_x, waypoint_y = self.path_waypoints[self.current_waypoint_idx]
         
         # Calculate distance to current waypoint
-        distance = get_distance(self.center_x, self.center_y, waypoint_x, waypoint_y)
+        distance_sq = get_distance_sq(self.center_x, self.center_y, waypoint_x, waypoint_y)
         
         # If close enough to waypoint, move to next one
-        if distance < self.movement_threshold:
+        if distance_sq < self.movement_threshold_sq:
             self.current_waypoint_idx += 1
             if self.current_waypoint_idx >= len(self.path_waypoints):
                 # Reached final destination
@@ -240,57 +518,33 @@ class Player(arcade.SpriteSolidColor):
                 self.animated_sprite.update_animation(0, 0)
                 return
             waypoint_x, waypoint_y = self.path_waypoints[self.current_waypoint_idx]
-            distance = get_distance(self.center_x, self.center_y, waypoint_x, waypoint_y)
-        
-        # Calculate direction vector toward waypoint
-        dx = waypoint_x - self.center_x
-        dy = waypoint_y - self.center_y
-        
-        # Normalize and scale by speed
-        magnitude = math.sqrt(dx * dx + dy * dy)
-        norm_dx = 0
-        norm_dy = 0
-        if magnitude > 0:
-            norm_dx = dx / magnitude
-            norm_dy = dy / magnitude
-            dx = norm_dx * self.speed
-            dy = norm_dy * self.speed
-        
-        # Calculate new position
-        new_x = self.center_x + dx
-        new_y = self.center_y + dy
-        
-        # Check screen boundaries
-        new_x = max(self.radius, min(screen_width - self.radius, new_x))
-        new_y = max(self.radius, min(screen_height - self.radius, new_y))
         
-        # Check obstacle collisions
-        collision = False
-        for obstacle in obstacles:
-            closest_x = max(obstacle.left, min(new_x, obstacle.right))
-            closest_y = max(obstacle.bottom, min(new_y, obstacle.top))
-            
-            dist = get_distance(new_x, new_y, closest_x, closest_y)
-            if dist < self.radius + 2:  # Small buffer
-                collision = True
-                break
+        # Step toward the waypoint and test walls near the new position
+        collision_buffer = 2  # Small buffer
+        new_x, new_y, collision = step_toward_nb(
+            self.center_x, self.center_y, waypoint_x, waypoint_y, self.speed,
+            self.radius, collision_buffer, screen_width, screen_height,
+            obstacles.query_aabb(self.center_x, self.center_y,
+                                 self.speed + self.radius + collision_buffer)
+        )
         
         if not collision:
+            # Update animation with the direction of travel
+            self.animated_sprite.update_animation(waypoint_x - self.center_x,
+                                                  waypoint_y - self.center_y)
             # Move to new position
             self.center_x = new_x
             self.center_y = new_y
             # Update animated sprite
             self.animated_sprite.center_x = new_x
             self.animated_sprite.center_y = new_y
-            # Update animation with normalized direction
-            self.animated_sprite.update_animation(norm_dx, norm_dy)
         else:
             # Path is blocked, try to recalculate
             # For now, just clear target (player can click again)
             self.clear_target()
             self.animated_sprite.update_animation(0, 0)
 
-    def move(self, dx: float, dy: float, obstacles: List[Obstacle],
+    def move(self, dx: float, dy: float, obstacles: 'ObstacleIndex',
              screen_width: float, screen_height: float) -> bool:
         """Déplacement discret, case par case."""
         if not self.alive or self.is_attacking:
@@ -299,15 +553,16 @@ class Player(arcade.SpriteSolidColor):
         if dx == 0 and dy == 0:
             return False
 
-        step = config.TILE_SIZE  # Taille d'une case
+        step = self.TILE_SIZE  # Taille d'une case
         new_x = self.center_x + dx * step
         new_y = self.center_y + dy * step
 
         # Vérifie collisions
-        for obstacle in obstacles:
-            closest_x = max(obstacle.left, min(new_x, obstacle.right))
-            closest_y = max(obstacle.bottom, min(new_y, obstacle.top))
-            if get_distance(new_x, new_y, closest_x, closest_y) < self.radius:
+        radius_sq = self.radius * self.radius
+        for left, right, bottom, top in obstacles.query(new_x, new_y, self.radius):
+            ddx = new_x - left if new_x < left else (new_x - right if new_x > right else 0.0)
+            ddy = new_y - bottom if new_y < bottom else (new_y - top if new_y > top else 0.0)
+            if ddx * ddx + ddy * ddy < radius_sq:
                 return False  # collision
 
         # Vérifie bords écran
@@ -326,10 +581,9 @@ class Player(arcade.SpriteSolidColor):
         """Check if player is close enough to attack enemy."""
         if not self.alive or not enemy.alive or self.is_attacking:
             return False
-        distance = get_distance(self.center_x, self.center_y, 
-                               enemy.center_x, enemy.center_y)
-        attack_range = getattr(config, 'PLAYER_MELEE_RANGE', getattr(config, 'PLAYER_ATTACK_RANGE', 30))
-        return distance < attack_range
+        distance_sq = get_distance_sq(self.center_x, self.center_y,
+                                      enemy.center_x, enemy.center_y)
+        return distance_sq < self.ATTACK_RANGE_SQ
     
     def start_attack(self, enemy: 'Enemy'):
         """
@@ -418,6 +672,28 @@ class Enemy(arcade.SpriteSolidColor):
     Enemy AI with patrol and chase behavior, using ray casting for vision.
     """
     
+    # Slots for the AI fields read every frame (see Player.__slots__)
+    __slots__ = ('radius', 'speed', 'chase_speed', 'alive', 'state',
+                 'vision_range', 'vision_range_sq', 'fov', 'cos_half_fov', 'cos_half_fov_sq',
+                 '_vision_angle', 'vision_slack', 'can_see_player', 'last_known_player_pos',
+                 'alert_timer', 'alert_duration', 'is_shooting', 'shoot_cooldown',
+                 'shoot_delay_timer', 'target_position', 'path_waypoints',
+                 'current_waypoint_idx', 'movement_threshold', 'movement_threshold_sq',
+                 'path_recalc_timer', 'current_patrol_index', 'patrol_pause_counter',
+                 '_forward', '_los_key', '_los_result', '_rng_idx', '_vision_aabb', '_vision_center',
+                 '_vision_countdown', '_vision_version')
+    
+    # Config values read every frame, resolved once at import
+    # (GUARD_* with ENEMY_* fallbacks for compatibility)
+    PATROL_COLOR = getattr(config, 'GUARD_COLOR', getattr(config, 'ENEMY_COLOR', (255, 50, 50)))
+    ALERT_COLOR = getattr(config, 'GUARD_ALERT_COLOR', getattr(config, 'ENEMY_ALERT_COLOR', (255, 150, 0)))
+    SHOOT_DELAY = getattr(config, 'ENEMY_SHOOT_DELAY', 30)
+    SHOOT_COOLDOWN = getattr(config, 'ENEMY_SHOOT_COOLDOWN', 60)
+    FLASH_THRESHOLD = SHOOT_COOLDOWN - 5  # Muzzle flash shows while cooldown is above this
+    ALERTED_STATES = ('chase', 'alert')  # States reported as alerted in observations
+    PATROL_PAUSE_TIME = config.GUARD_PATROL_PAUSE_TIME
+    VISION_PERIOD = getattr(config, 'GUARD_VISION_PERIOD', 1)
+    
     def __init__(self, x: float, y: float):
         # Use GUARD config if available, fall back to ENEMY for compatibility
         size = getattr(config, 'GUARD_SIZE', getattr(config, 'ENEMY_SIZE', 20))
@@ -437,6 +713,22 @@ class Enemy(arcade.SpriteSolidColor):
         self.fov = getattr(config, 'GUARD_VISION_ANGLE', getattr(config, 'ENEMY_VISION_ANGLE', 60))
         self.can_see_player = False
         
+        # Derived vision constants, so the per-frame check needs no sqrt or trig
+        self.vision_range_sq = self.vision_range * self.vision_range
+        self.cos_half_fov = math.cos(math.radians(self.fov / 2))
+        self.cos_half_fov_sq = self.cos_half_fov * self.cos_half_fov
+        
+        # Last line-of-sight test: (enemy x, y, player x, y, obstacles version) and its result
+        self._los_key = None
+        self._los_result = False
+        
+        # Obstacles that can block sight from around the current position,
+        # refreshed once the enemy drifts more than vision_slack away
+        self.vision_slack = getattr(config, 'TILE_SIZE', 50)
+        self._vision_version = -1  # ObstacleIndex.version the cached bounds come from
+        self._vision_center = (x, y)
+        self._vision_aabb = None
+        
         # AI state
         self.state = "patrol"  # patrol, chase, alert
         self.current_patrol_index = 0
@@ -457,22 +749,51 @@ class Enemy(arcade.SpriteSolidColor):
         self.path_waypoints = []  # Waypoints from A* pathfinding
         self.current_waypoint_idx = 0
         self.movement_threshold = 8.0  # Distance to consider waypoint reached
+        self.movement_threshold_sq = self.movement_threshold * self.movement_threshold
         self.path_recalc_timer = 0  # Timer to avoid recalculating path every frame
         
-    def update_ai(self, player: Player, obstacles: List[Obstacle], delta_time: float = 1.0,
-                  grid_width: int = 16, grid_height: int = 16, tile_size: int = 50) -> Optional[Bullet]:
+        # Position in the shared random stream
+        self._rng_idx = random.randrange(RNG_STREAM_SIZE)
+        
+        # Frames until the next vision check; random phase staggers enemies
+        self._vision_countdown = random.randrange(self.VISION_PERIOD)
+        
+    @property
+    def vision_angle(self) -> float:
+        """Direction the enemy is facing, in degrees."""
+        if self._vision_angle is None:
+            forward_x, forward_y = self._forward
+            self._vision_angle = math.degrees(math.atan2(forward_y, forward_x))
+        return self._vision_angle
+    
+    @vision_angle.setter
+    def vision_angle(self, angle: float):
+        # Keep the unit vector used by movement and the vision cone in sync
+        angle_rad = math.radians(angle)
+        self._forward = (math.cos(angle_rad), math.sin(angle_rad))
+        self._vision_angle = angle
+    
+    @property
+    def forward(self) -> Tuple[float, float]:
+        """Unit vector of vision_angle."""
+        return self._forward
+    
+    def update_ai(self, player: Player, obstacles: 'ObstacleIndex', delta_time: float = 1.0,
+                  grid_width: int = 16, grid_height: int = 16, tile_size: int = 50,
+                  bullet_pool: Optional[BulletPool] = None) -> Optional[Bullet]:
         """
         Update enemy AI behavior.
         
         Args:
             player: Player entity
-            obstacles: List of obstacles
+            obstacles: Broadphase index of the level's obstacles
             delta_time: Time multiplier for speed
             grid_width, grid_height: Grid dimensions for pathfinding
             tile_size: Tile size for pathfinding
+            bullet_pool: If given, shots are spawned straight into this pool
         
         Returns:
-            Bullet object if enemy shoots, None otherwise
+            Bullet object if enemy shoots without a bullet_pool, None otherwise
         """
         if not self.alive:
             return None
@@ -481,25 +802,44 @@ class Enemy(arcade.SpriteSolidColor):
         if self.shoot_cooldown > 0:
             self.shoot_cooldown -= 1
         
-        # Check if can see player
-        self.can_see_player = self._check_player_vision(player, obstacles)
+        # Offset to the player, shared by the vision check and shooting
+        to_player_x = player.center_x - self.center_x
+        to_player_y = player.center_y - self.center_y
+        
+        # Check if can see player, every VISION_PERIOD frames; the last
+        # result is reused in between
+        if not player.alive:
+            self.can_see_player = False
+        elif self._vision_countdown > 0:
+            self._vision_countdown -= 1
+        else:
+            self._vision_countdown = self.VISION_PERIOD - 1
+            self.can_see_player = self._check_player_vision(player, obstacles,
+                                                            to_player_x, to_player_y)
         
         bullet = None
         if self.can_see_player:
             self.state = "chase"
             self.last_known_player_pos = (player.center_x, player.center_y)
             self.alert_timer = self.alert_duration
-            self.color = getattr(config, 'GUARD_ALERT_COLOR', getattr(config, 'ENEMY_ALERT_COLOR', (255, 150, 0)))
+            self.color = self.ALERT_COLOR
             
             # Handle shooting
-            delay = getattr(config, 'ENEMY_SHOOT_DELAY', 30)
-            if self.shoot_delay_timer < delay:
+            if self.shoot_delay_timer < self.SHOOT_DELAY:
                 self.shoot_delay_timer += 1
             elif self.shoot_cooldown == 0:
-                # Shoot at player
-                bullet = self._shoot_at_player(player)
-                cooldown = getattr(config, 'ENEMY_SHOOT_COOLDOWN', 60)
-                self.shoot_cooldown = cooldown
+                # Shoot at player, along the offset already computed
+                dist = math.hypot(to_player_x, to_player_y)
+                if dist > 0:
+                    dir_x = to_player_x / dist
+                    dir_y = to_player_y / dist
+                else:
+                    dir_x, dir_y = 1.0, 0.0
+                if bullet_pool is not None:
+                    bullet_pool.spawn(self.center_x, self.center_y, dir_x, dir_y, id(self))
+                else:
+                    bullet = self._shoot_at_player(dir_x, dir_y)
+                self.shoot_cooldown = self.SHOOT_COOLDOWN
                 self.is_shooting = True
         else:
             # Reset shoot delay when losing sight of player
@@ -509,11 +849,10 @@ class Enemy(arcade.SpriteSolidColor):
             if self.alert_timer > 0:
                 self.state = "alert"
                 self.alert_timer -= 1
-                self.color = getattr(config, 'GUARD_ALERT_COLOR', getattr(config, 'ENEMY_ALERT_COLOR', (255, 150, 0)))
+                self.color = self.ALERT_COLOR
             else:
                 self.state = "patrol"
-                color = getattr(config, 'GUARD_COLOR', getattr(config, 'ENEMY_COLOR', (255, 50, 50)))
-                self.color = color
+                self.color = self.PATROL_COLOR
         
         # Update path recalc timer
         if self.path_recalc_timer > 0:
@@ -530,42 +869,77 @@ class Enemy(arcade.SpriteSolidColor):
         
         return bullet
     
-    def _check_player_vision(self, player: Player, obstacles: List[Obstacle]) -> bool:
-        """Check if enemy can see the player using ray casting."""
-        if not player.alive:
-            return False
+    def _check_player_vision(self, player: Player, obstacles: 'ObstacleIndex',
+                             to_player_x: float, to_player_y: float) -> bool:
+        """
+        Check if enemy can see the player using ray casting.
         
-        # Check if player is in vision cone
-        in_cone = is_point_in_cone(
-            player.center_x, player.center_y,
-            self.center_x, self.center_y,
-            self.vision_angle, self.fov, self.vision_range
-        )
+        Args:
+            player: Player entity, already known to be alive
+            obstacles: Obstacles that block sight
+            to_player_x, to_player_y: Offset from the enemy to the player
+        """
+        # Range check on squared distance
+        dist_sq = to_player_x * to_player_x + to_player_y * to_player_y
+        if dist_sq > self.vision_range_sq:
+            return False
         
-        if not in_cone:
+        # Cone check: cos(angle to player) >= cos(fov / 2), compared squared
+        forward_x, forward_y = self._forward
+        dot = forward_x * to_player_x + forward_y * to_player_y
+        if self.cos_half_fov >= 0:
+            if dot < 0 or dot * dot < self.cos_half_fov_sq * dist_sq:
+                return False
+        elif dot < 0 and dot * dot > self.cos_half_fov_sq * dist_sq:
             return False
         
-        # Check line of sight (not blocked by obstacles)
-        return has_line_of_sight(self.center_x, self.center_y,
-                                player.center_x, player.center_y,
-                                obstacles)
+        # Check line of sight (not blocked by obstacles); reuse the last
+        # result while neither end has moved (idle player, paused guard)
+        key = (self.center_x, self.center_y, player.center_x, player.center_y, obstacles.version)
+        if key != self._los_key:
+            self._los_key = key
+            self._los_result = line_of_sight_nb(self.center_x, self.center_y,
+                                                player.center_x, player.center_y,
+                                                self._nearby_obstacles(obstacles))
+        return self._los_result
+    
+    def _nearby_obstacles(self, obstacles: 'ObstacleIndex') -> np.ndarray:
+        """
+        Get the obstacles close enough to block a sight line.
+        
+        A sight line is at most vision_range long, so only obstacles within
+        vision_range (+ slack for movement since the last refresh) matter.
+        
+        Returns:
+            (N, 4) float32 array of obstacle (left, right, bottom, top)
+        """
+        cx, cy = self._vision_center
+        dx = self.center_x - cx
+        dy = self.center_y - cy
+        if (obstacles.version != self._vision_version or
+                dx * dx + dy * dy > self.vision_slack * self.vision_slack):
+            self._vision_version = obstacles.version
+            self._vision_center = (self.center_x, self.center_y)
+            self._vision_aabb = obstacles.query_aabb(
+                self.center_x, self.center_y, self.vision_range + 2 * self.vision_slack
+            )
+        return self._vision_aabb
     
-    def _shoot_at_player(self, player: Player) -> Bullet:
+    def _shoot_at_player(self, dir_x: float, dir_y: float) -> Bullet:
         """
         Create a bullet aimed at the player.
         
+        Args:
+            dir_x, dir_y: Unit direction from the enemy to the player
+        
         Returns:
             Bullet object
         """
-        # Calculate angle to player
-        angle = get_angle_to_point(self.center_x, self.center_y,
-                                   player.center_x, player.center_y)
-        
         # Create bullet at enemy position
-        bullet = Bullet(self.center_x, self.center_y, angle, id(self))
+        bullet = Bullet(self.center_x, self.center_y, dir_x, dir_y, id(self))
         return bullet
     
-    def _set_pathfinding_target(self, target_x: float, target_y: float, obstacles: List[Obstacle],
+    def _set_pathfinding_target(self, target_x: float, target_y: float, obstacles: 'ObstacleIndex',
                                 grid_width: int, grid_height: int, tile_size: int):
         """
         Calculate A* path to target position.
@@ -623,33 +997,44 @@ class Enemy(arcade.SpriteSolidColor):
         waypoint_x, waypoint_y = self.path_waypoints[self.current_waypoint_idx]
         
         # Calculate distance to current waypoint
-        distance = get_distance(self.center_x, self.center_y, waypoint_x, waypoint_y)
+        distance_sq = get_distance_sq(self.center_x, self.center_y, waypoint_x, waypoint_y)
         
         # If close enough to waypoint, move to next one
-        if distance < self.movement_threshold:
+        if distance_sq < self.movement_threshold_sq:
             self.current_waypoint_idx += 1
             if self.current_waypoint_idx >= len(self.path_waypoints):
                 self._clear_path()
                 return True
             waypoint_x, waypoint_y = self.path_waypoints[self.current_waypoint_idx]
         
-        # Calculate angle to waypoint and update vision direction
-        angle = get_angle_to_point(self.center_x, self.center_y, waypoint_x, waypoint_y)
-        self.vision_angle = angle
-        
-        # Move toward waypoint
-        angle_rad = math.radians(angle)
-        move_speed = self.speed * speed_multiplier
-        dx = math.cos(angle_rad) * move_speed
-        dy = math.sin(angle_rad) * move_speed
-        
-        # Direct movement (pathfinding already avoids obstacles)
-        self.center_x += dx
-        self.center_y += dy
-        
+        self._move_toward(waypoint_x, waypoint_y, self.speed * speed_multiplier)
         return False
     
-    def _chase_player(self, player: Player, obstacles: List[Obstacle], delta_time: float,
+    def _move_toward(self, target_x: float, target_y: float, move_speed: float):
+        """
+        Face a point and step toward it; the movement primitive of every AI state.
+        
+        Args:
+            target_x, target_y: Point to move toward
+            move_speed: Distance to cover this frame
+        """
+        tdx = target_x - self.center_x
+        tdy = target_y - self.center_y
+        
+        # Face along the unit vector and step on it (pathfinding already avoids
+        # obstacles); vision_angle is only derived from it when read
+        dist = math.hypot(tdx, tdy)
+        if dist > 0:
+            forward_x = tdx / dist
+            forward_y = tdy / dist
+            self._forward = (forward_x, forward_y)
+            self._vision_angle = None
+            self.center_x += forward_x * move_speed
+            self.center_y += forward_y * move_speed
+        else:
+            self.vision_angle = 0.0
+    
+    def _chase_player(self, player: Player, obstacles: 'ObstacleIndex', delta_time: float,
                      grid_width: int, grid_height: int, tile_size: int):
         """Chase the player using pathfinding."""
         # Recalculate path periodically or when target changed significantly
@@ -660,9 +1045,9 @@ class Enemy(arcade.SpriteSolidColor):
         
         # Also recalculate if target moved significantly
         if self.target_position:
-            dist_to_old_target = get_distance(player.center_x, player.center_y,
-                                              self.target_position[0], self.target_position[1])
-            if dist_to_old_target > 30:  # Player moved more than 30 pixels
+            dist_to_old_target_sq = get_distance_sq(player.center_x, player.center_y,
+                                                    self.target_position[0], self.target_position[1])
+            if dist_to_old_target_sq > 30 * 30:  # Player moved more than 30 pixels
                 should_recalc = True
         else:
             should_recalc = True
@@ -675,22 +1060,22 @@ class Enemy(arcade.SpriteSolidColor):
         self._follow_path(self.chase_speed * delta_time)
     
     def _investigate_position(self, position: Tuple[float, float], 
-                            obstacles: List[Obstacle], delta_time: float,
+                            obstacles: 'ObstacleIndex', delta_time: float,
                             grid_width: int, grid_height: int, tile_size: int):
         """Move to last known player position using pathfinding."""
         target_x, target_y = position
-        distance = get_distance(self.center_x, self.center_y, target_x, target_y)
+        distance_sq = get_distance_sq(self.center_x, self.center_y, target_x, target_y)
         
-        if distance < 10:  # Reached position
+        if distance_sq < 10 * 10:  # Reached position
             self.last_known_player_pos = None
             self.alert_timer = 0
             self._clear_path()
             return
         
         # Set path to investigation position if not already set
-        if not self.target_position or get_distance(target_x, target_y, 
-                                                    self.target_position[0], 
-                                                    self.target_position[1]) > 5:
+        if not self.target_position or get_distance_sq(target_x, target_y,
+                                                       self.target_position[0],
+                                                       self.target_position[1]) > 5 * 5:
             self._set_pathfinding_target(target_x, target_y, obstacles,
                                         grid_width, grid_height, tile_size)
         
@@ -700,7 +1085,7 @@ class Enemy(arcade.SpriteSolidColor):
             self.last_known_player_pos = None
             self.alert_timer = 0
 
-    def _patrol(self, obstacles: List[Obstacle], delta_time: float,
+    def _patrol(self, obstacles: 'ObstacleIndex', delta_time: float,
                 grid_width: int, grid_height: int, tile_size: int):
 
         # Handle pause state
@@ -713,7 +1098,7 @@ class Enemy(arcade.SpriteSolidColor):
             reached = self._follow_path(self.speed * delta_time)
             if reached:
                 # Reached the tile, pause before choosing next move
-                self.patrol_pause_counter = random.randint(5, config.GUARD_PATROL_PAUSE_TIME)  # Pause 0.33-1 second
+                self.patrol_pause_counter = self._random_int(5, self.PATROL_PAUSE_TIME)  # Pause 0.33-1 second
                 self._clear_path()
             return
 
@@ -722,16 +1107,8 @@ class Enemy(arcade.SpriteSolidColor):
         current_tile_x = int(self.center_x / tile_size)
         current_tile_y = int(self.center_y / tile_size)
 
-        # Possible moves: up, down, left, right
-        possible_moves = [
-            (0, 1),  # Up
-            (0, -1),  # Down
-            (1, 0),  # Right
-            (-1, 0),  # Left
-        ]
-
-        # Shuffle moves for randomness
-        random.shuffle(possible_moves)
+        # Possible moves (up, down, right, left) in a random order
+        possible_moves = PATROL_MOVE_ORDERS[self._random_int(0, len(PATROL_MOVE_ORDERS) - 1)]
 
         # Try each direction until we find a valid tile
         for dx, dy in possible_moves:
@@ -749,9 +1126,9 @@ class Enemy(arcade.SpriteSolidColor):
 
             # Check if tile is blocked by obstacle
             tile_blocked = False
-            for obstacle in obstacles:
-                if (obstacle.left <= target_x <= obstacle.right and
-                        obstacle.bottom <= target_y <= obstacle.top):
+            for left, right, bottom, top in obstacles.query(target_x, target_y, 0):
+                if (left <= target_x <= right and
+                        bottom <= target_y <= top):
                     tile_blocked = True
                     break
 
@@ -767,80 +1144,16 @@ class Enemy(arcade.SpriteSolidColor):
 
         # If no valid moves found (stuck), just pause
         if not self.target_position:
-            self.patrol_pause_counter = random.randint(30, 60)
+            self.patrol_pause_counter = self._random_int(30, 60)
 
-    def _move_with_collision(self, dx: float, dy: float, obstacles: List[Obstacle]) -> bool:
-        """Move with obstacle collision detection."""
-        # Add a small buffer to prevent clipping into walls
-        buffer = 2.0
-        
-        new_x = self.center_x + dx
-        new_y = self.center_y + dy
-        
-        # Check boundaries with buffer
-        new_x = max(self.radius + buffer, min(config.SCREEN_WIDTH - self.radius - buffer, new_x))
-        new_y = max(self.radius + buffer, min(config.SCREEN_HEIGHT - self.radius - buffer, new_y))
-        
-        # Check obstacle collisions with expanded collision radius
-        collision = False
-        collision_radius = self.radius + buffer
-        
-        for obstacle in obstacles:
-            # Calculate closest point on rectangle to circle
-            closest_x = max(obstacle.left, min(new_x, obstacle.right))
-            closest_y = max(obstacle.bottom, min(new_y, obstacle.top))
-            
-            # Calculate distance from center of enemy to closest point
-            dist = get_distance(new_x, new_y, closest_x, closest_y)
-            
-            if dist < collision_radius:
-                collision = True
-                break
-        
-        if not collision:
-            self.center_x = new_x
-            self.center_y = new_y
-            return True
-        else:
-            # If collision, try sliding along the wall
-            # Try moving only in x direction
-            test_x = self.center_x + dx
-            test_x = max(self.radius + buffer, min(config.SCREEN_WIDTH - self.radius - buffer, test_x))
-            
-            x_collision = False
-            for obstacle in obstacles:
-                closest_x = max(obstacle.left, min(test_x, obstacle.right))
-                closest_y = max(obstacle.bottom, min(self.center_y, obstacle.top))
-                dist = get_distance(test_x, self.center_y, closest_x, closest_y)
-                if dist < collision_radius:
-                    x_collision = True
-                    break
-            
-            if not x_collision:
-                self.center_x = test_x
-                return True
-            
-            # Try moving only in y direction
-            test_y = self.center_y + dy
-            test_y = max(self.radius + buffer, min(config.SCREEN_HEIGHT - self.radius - buffer, test_y))
-            
-            y_collision = False
-            for obstacle in obstacles:
-                closest_x = max(obstacle.left, min(self.center_x, obstacle.right))
-                closest_y = max(obstacle.bottom, min(test_y, obstacle.top))
-                dist = get_distance(self.center_x, test_y, closest_x, closest_y)
-                if dist < collision_radius:
-                    y_collision = True
-                    break
-            
-            if not y_collision:
-                self.center_y = test_y
-                return True
-            
-            # If both failed, rotate vision angle
-            self.vision_angle = (self.vision_angle + random.uniform(45, 135)) % 360
-        
-        return False
+    def _random(self) -> float:
+        """Next uniform [0, 1) sample from the pre-rolled stream."""
+        self._rng_idx = (self._rng_idx + 1) & (RNG_STREAM_SIZE - 1)
+        return RNG_STREAM[self._rng_idx]
+    
+    def _random_int(self, low: int, high: int) -> int:
+        """Random integer in [low, high], like random.randint."""
+        return low + int(self._random() * (high - low + 1))
     
     def die(self):
         """Kill the enemy."""
@@ -859,6 +1172,22 @@ class Enemy(arcade.SpriteSolidColor):
             player.center_x, player.center_y, player.radius
         )
     
+    def muzzle_flash_position(self) -> Optional[Tuple[float, float]]:
+        """
+        Get where to draw the muzzle flash (the env batches all flashes).
+        
+        Returns:
+            Flash center at the front of the enemy right after a shot, else None
+        """
+        if not (self.alive and self.is_shooting and
+                self.shoot_cooldown > self.FLASH_THRESHOLD):
+            return None
+        # Along the cached facing vector: no trig per flash
+        forward_x, forward_y = self._forward
+        flash_distance = self.radius + 5
+        return (self.center_x + forward_x * flash_distance,
+                self.center_y + forward_y * flash_distance)
+    
     def draw_colored(self):
         """Draw the enemy as a colored circle."""
         if self.alive:
@@ -868,15 +1197,3 @@ class Enemy(arcade.SpriteSolidColor):
                 self.color
             )
             
-            # Draw muzzle flash when shooting
-            cooldown = getattr(config, 'ENEMY_SHOOT_COOLDOWN', 60)
-            if self.is_shooting and self.shoot_cooldown > cooldown - 5:
-                # Flash at the front of the enemy
-                angle_rad = math.radians(self.vision_angle)
-                flash_distance = self.radius + 5
-                flash_x = self.center_x + math.cos(angle_rad) * flash_distance
-                flash_y = self.center_y + math.sin(angle_rad) * flash_distance
-                
-                # Draw bright flash
-                arcade.draw_circle_filled(flash_x, flash_y, 8, (255, 255, 200))
-                arcade.draw_circle_filled(flash_x, flash_y, 5, (255, 255, 100))
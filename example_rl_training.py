@@ -1,3 +1,4 @@
+from collections import deque
 import numpy as np
 from game_env import HunterAssassinEnv
 
@@ -8,12 +9,13 @@ class RandomAgent:
     Useful for testing the environment and as a baseline for comparison.
     """
     
-    def __init__(self, action_space_size):
+    def __init__(self, action_space_size, seed=None):
         self.action_space_size = action_space_size
+        self.rng = np.random.default_rng(seed)
     
     def select_action(self, observation):
         """Select a random action."""
-        return np.random.randint(0, self.action_space_size)
+        return self.rng.integers(0, self.action_space_size)
     
     def learn(self, obs, action, reward, next_obs, done):
         """Random agent doesn't learn."""
@@ -26,9 +28,10 @@ class SimpleQLearningAgent:
     This is a basic example - for real training, use deep RL algorithms.
     """
     
-    def __init__(self, observation_size, action_space_size):
+    def __init__(self, observation_size, action_space_size, seed=None):
         self.observation_size = observation_size
         self.action_space_size = action_space_size
+        self.rng = np.random.default_rng(seed)
         
         # Hyperparameters
         self.epsilon = 1.0  # Exploration rate
@@ -41,12 +44,30 @@ class SimpleQLearningAgent:
         print(f"Initialized agent with obs_size={observation_size}, action_size={action_space_size}")
     
     def select_action(self, observation):
-        """Epsilon-greedy action selection."""
-        if np.random.random() < self.epsilon:
-            return np.random.randint(0, self.action_space_size)
+        """
+        Epsilon-greedy action selection.
+        
+        Args:
+            observation: One observation, or a (B, obs_size) batch from
+                parallel environments
+        
+        Returns:
+            An action, or a (B,) array of actions for a batch
+        """
+        if getattr(observation, 'ndim', 1) == 2:
+            batch_size = len(observation)
+            explore = self.rng.random(batch_size) < self.epsilon
+            random_actions = self.rng.integers(0, self.action_space_size, size=batch_size)
+            # Placeholder agent: no Q-values, so greedy == random. A real agent
+            # takes its Q-network's argmax(-1) over the batch here.
+            greedy_actions = self.rng.integers(0, self.action_space_size, size=batch_size)
+            return np.where(explore, random_actions, greedy_actions)
+        
+        if self.rng.random() < self.epsilon:
+            return self.rng.integers(0, self.action_space_size)
         else:
-            # In real implementation, this would use your Q-network
-            return np.random.randint(0, self.action_space_size)
+            # Placeholder agent: greedy == random (a real agent takes its Q-network's argmax)
+            return self.rng.integers(0, self.action_space_size)
     
     def learn(self, obs, action, reward, next_obs, done):
         """Update Q-values based on experience."""
@@ -68,13 +89,24 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
         num_episodes: Number of episodes to train
         render: Whether to render the game
         print_every: Print statistics every N episodes
+    
+    Returns:
+        Tuple of NumPy arrays (rewards, lengths, kills), one entry per episode
     """
     env = HunterAssassinEnv(render_mode=render)
     
-    # Statistics
-    episode_rewards = []
-    episode_lengths = []
-    episode_kills = []
+    # Statistics: rolling windows for the progress report, running totals
+    # for the summary
+    recent_rewards = deque(maxlen=print_every)
+    recent_lengths = deque(maxlen=print_every)
+    recent_kills = deque(maxlen=print_every)
+    recent_wins = deque(maxlen=print_every)
+    total_reward = 0.0
+    total_kills = 0
+    best_reward = float('-inf')
+    episode_rewards = np.empty(num_episodes, dtype=np.float32)
+    episode_lengths = np.empty(num_episodes, dtype=np.int32)
+    episode_kills = np.empty(num_episodes, dtype=np.int32)
     wins = 0
     
     print("\n" + "="*60)
@@ -86,6 +118,16 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
     print(f"Rendering: {render}")
     print("="*60 + "\n")
     
+    # Pick the step function once: headless training skips the render check
+    if render:
+        def step(action):
+            result = env.step(action)
+            env.on_draw()
+            env.flip()
+            return result
+    else:
+        step = env.step
+    
     for episode in range(num_episodes):
         obs = env.reset()
         done = False
@@ -96,8 +138,8 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
             # Agent selects action
             action = agent.select_action(obs)
             
-            # Execute action
-            next_obs, reward, done, info = env.step(action)
+            # Execute action (and render if enabled)
+            next_obs, reward, done, info = step(action)
             
             # Agent learns from experience
             agent.learn(obs, action, reward, next_obs, done)
@@ -106,18 +148,20 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
             obs = next_obs
             episode_reward += reward
             steps += 1
-            
-            # Render if enabled
-            if render:
-                env.on_draw()
-                env.flip()
         
         # Record statistics
-        episode_rewards.append(episode_reward)
-        episode_lengths.append(steps)
-        episode_kills.append(info['kills'])
+        recent_rewards.append(episode_reward)
+        recent_lengths.append(steps)
+        recent_kills.append(info['kills'])
+        total_reward += episode_reward
+        total_kills += info['kills']
+        best_reward = max(best_reward, episode_reward)
+        episode_rewards[episode] = episode_reward
+        episode_lengths[episode] = steps
+        episode_kills[episode] = info['kills']
         if info.get('win', False):
             wins += 1
+        recent_wins.append(int(info.get('win', False)))
         
         # Decay exploration (if agent supports it)
         if hasattr(agent, 'decay_epsilon'):
@@ -125,11 +169,10 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
         
         # Print progress
         if (episode + 1) % print_every == 0:
-            avg_reward = np.mean(episode_rewards[-print_every:])
-            avg_length = np.mean(episode_lengths[-print_every:])
-            avg_kills = np.mean(episode_kills[-print_every:])
-            win_rate = sum(1 for i in range(episode - print_every + 1, episode + 1) 
-                          if i < len(episode_rewards) and info.get('win', False)) / print_every
+            avg_reward = sum(recent_rewards) / len(recent_rewards)
+            avg_length = sum(recent_lengths) / len(recent_lengths)
+            avg_kills = sum(recent_kills) / len(recent_kills)
+            win_rate = sum(recent_wins) / len(recent_wins)
             
             print(f"Episode {episode + 1}/{num_episodes}")
             print(f"  Avg Reward: {avg_reward:.2f}")
@@ -148,9 +191,9 @@ def train_agent(agent, num_episodes=1000, render=True, print_every=10):
     print("="*60)
     print(f"Total Episodes: {num_episodes}")
     print(f"Total Wins: {wins} ({wins/num_episodes*100:.1f}%)")
-    print(f"Average Reward: {np.mean(episode_rewards):.2f}")
-    print(f"Average Kills: {np.mean(episode_kills):.2f}")
-    print(f"Best Episode Reward: {max(episode_rewards):.2f}")
+    print(f"Average Reward: {total_reward / num_episodes:.2f}")
+    print(f"Average Kills: {total_kills / num_episodes:.2f}")
+    print(f"Best Episode Reward: {best_reward:.2f}")
     print("="*60 + "\n")
     
     return episode_rewards, episode_lengths, episode_kills
@@ -3,13 +3,16 @@ Hunter Assassin Game Environment - RL Ready
 Provides Gym-like interface for reinforcement learning
 """
 import arcade
+import arcade.shape_list
 import numpy as np
 import random
 import math
 from typing import Tuple, Dict, Optional, List
 import config
-from entities import Player, Enemy, Obstacle, Bullet
-from utils import cast_ray, get_distance, check_collision_circles
+from entities import Player, Enemy, Obstacle, BulletPool, draw_circle_batch, refill_rng_stream
+from obstacle_index import ObstacleIndex
+from utils import get_distance_sq, check_collision_circles
+from utils_numba import ray_distances_nb
 from map_layouts import get_apartment_layout
 
 
@@ -34,6 +37,33 @@ class HunterAssassinEnv(arcade.Window):
         - Distance to nearest enemy: small positive reward for getting closer
     """
     
+    # Config values read every step or frame, resolved once at import
+    USE_APARTMENT_LAYOUT = getattr(config, 'USE_APARTMENT_LAYOUT', False)
+    DRAW_FLOOR = config.USE_JSON_MAP or USE_APARTMENT_LAYOUT
+    FLOOR_GRID_SIZE = getattr(config, 'TILE_SIZE', 80)
+    FLOOR_GRID_COLOR = tuple(min(255, c + 5) for c in config.FLOOR_COLOR)
+    # Enemy slots in the observation; None means one per enemy on the level
+    OBSERVED_ENEMIES = getattr(config, 'NUM_GUARDS', getattr(config, 'NUM_ENEMIES', None))
+    OBSERVATION_DTYPE = np.dtype(config.OBSERVATION_DTYPE)
+    # Vision cone gradient layers: (fraction of vision range, RGBA color), widest first
+    VISION_LAYERS = (
+        (1.0, (255, 255, 0, 20)),  # Full range, very transparent
+        (0.7, (255, 200, 0, 30)),  # 70% range, more visible
+        (0.4, (255, 150, 0, 40)),  # 40% range, most visible
+    )
+    AIM_LINE_COLOR = (200, 200, 0)
+    AIM_LINE_SEEN_COLOR = (255, 200, 0)  # While the enemy sees the player
+    # (dx, dy) -> action index, for keyboard control
+    ACTION_BY_DIRECTION = {delta: action for action, delta in config.ACTIONS.items()}
+    # config.ACTION_DELTAS as plain tuples: a per-step index stays a tuple
+    # lookup, without a NumPy row view or .tolist()
+    ACTION_DELTAS = tuple(map(tuple, config.ACTION_DELTAS.tolist()))
+    
+    # Observation rays: NUM_RAYS unit directions spread evenly over 360 degrees
+    _RAY_ANGLES = np.radians(np.arange(config.NUM_RAYS) * (360 / config.NUM_RAYS))
+    RAY_DIR_X = np.cos(_RAY_ANGLES)
+    RAY_DIR_Y = np.sin(_RAY_ANGLES)
+    
     def __init__(self, render_mode: bool = True):
         """
         Initialize the game environment.
@@ -52,7 +82,19 @@ class HunterAssassinEnv(arcade.Window):
         self.player: Optional[Player] = None
         self.enemies: arcade.SpriteList = arcade.SpriteList()
         self.obstacles: arcade.SpriteList = arcade.SpriteList()
-        self.bullets: List[Bullet] = []
+        self.bullets = BulletPool()
+        # Enemy bodies and muzzle flashes (bright outer + inner circle), each
+        # drawn in one batched call
+        self.enemy_sprites = arcade.SpriteList()
+        self.flash_outer_sprites = arcade.SpriteList()
+        self.flash_inner_sprites = arcade.SpriteList()
+        self.obstacle_index = ObstacleIndex([])
+        self.obstacle_aabb = self.obstacle_index.aabb
+        # Static obstacle geometry, built on the first draw of each level
+        self.obstacle_shapes: Optional[arcade.shape_list.ShapeElementList] = None
+        self.obstacle_shapes_version = -1  # ObstacleIndex.version it was built from
+        # Floor fill and grid lines, the same for every level: built on the first draw
+        self.floor_shapes: Optional[arcade.shape_list.ShapeElementList] = None
         
         # Map dimensions for pathfinding
         self.grid_width = config.MAP_TILES_WIDTH if hasattr(config, 'MAP_TILES_WIDTH') else 16
@@ -63,6 +105,7 @@ class HunterAssassinEnv(arcade.Window):
         self.episode_step = 0
         self.total_reward = 0.0
         self.previous_min_enemy_distance = None
+        self.enemies_alive = 0  # Kept in step with the single kill site in step()
         self.game_started = True
         
         # Input tracking for manual control
@@ -78,8 +121,8 @@ class HunterAssassinEnv(arcade.Window):
             arcade.key.SPACE: False,
         }
         
-        # Visual settings
-        self.show_enemy_vision = True
+        # Visual settings (nothing is drawn headless)
+        self.show_enemy_vision = render_mode
         
         # UI Text objects (for performance)
         self.text_start = arcade.Text(
@@ -124,6 +167,8 @@ class HunterAssassinEnv(arcade.Window):
             10, 10,
             arcade.color.WHITE, 11, font_name="Arial"
         )
+        # Values each label was last formatted from (see _set_ui_text)
+        self.ui_values: Dict[arcade.Text, tuple] = {}
         
         # Initialize game
         self.reset()
@@ -139,6 +184,8 @@ class HunterAssassinEnv(arcade.Window):
         self.enemies.clear()
         self.obstacles.clear()
         self.bullets.clear()
+        # Enemy AI randomness follows the (possibly seeded) `random` state
+        refill_rng_stream()
         
         # Reset counters
         self.episode_step = 0
@@ -149,10 +196,13 @@ class HunterAssassinEnv(arcade.Window):
         # Create obstacles and entities based on layout mode
         if config.USE_JSON_MAP:
             self._generate_json_map()
-        elif hasattr(config, 'USE_APARTMENT_LAYOUT') and config.USE_APARTMENT_LAYOUT:
+        elif self.USE_APARTMENT_LAYOUT:
             self._generate_apartment_layout()
         else:
             self._generate_random_layout()
+        self.enemies_alive = len(self.enemies)
+        # Headless: keep the animation timing, skip the sprite updates
+        self.player.animated_sprite.update_visuals = self.render_mode
         
         return self._get_observation()
     
@@ -161,7 +211,7 @@ class HunterAssassinEnv(arcade.Window):
         Execute one time step in the environment.
         
         Args:
-            action: Action index from config.ACTIONS
+            action: Action index into ACTION_DELTAS (0 = stay)
         
         Returns:
             observation: Current state observation
@@ -174,59 +224,47 @@ class HunterAssassinEnv(arcade.Window):
         done = False
         info = {
             "kills": self.player.kills if self.player else 0,
-            "enemies_alive": sum(1 for e in self.enemies if e.alive),
+            "enemies_alive": self.enemies_alive,
             "player_alive": self.player.alive if self.player else False,
         }
         
         # Execute action
-        if action in config.ACTIONS:
-            dx, dy = config.ACTIONS[action]
+        if 0 <= action < len(self.ACTION_DELTAS):
+            dx, dy = self.ACTION_DELTAS[action]
             
             # Check if player is making a movement (not staying still)
             if not self.game_started and (dx != 0 or dy != 0):
                 self.game_started = True
             
             if self.player:
-                self.player.move(dx, dy, list(self.obstacles), 
+                self.player.move(dx, dy, self.obstacle_index, 
                                config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
         
-        # Update enemies and collect bullets (only if game has started)
+        # Update enemies; their shots go straight into the bullet pool (only if game has started)
         if self.game_started:
             for enemy in self.enemies:
                 if enemy.alive:
-                    bullet = enemy.update_ai(
+                    enemy.update_ai(
                         self.player, 
-                        list(self.obstacles),
+                        self.obstacle_index,
                         1.0,  # delta_time
                         self.grid_width,
                         self.grid_height,
-                        self.tile_size
+                        self.tile_size,
+                        bullet_pool=self.bullets
                     )
-                    if bullet:
-                        self.bullets.append(bullet)
         
-        # Update bullets
-        bullets_to_remove = []
-        for bullet in self.bullets:
-            should_remove = bullet.update(list(self.obstacles))
-            if should_remove:
-                bullets_to_remove.append(bullet)
-        
-        # Remove inactive bullets
-        for bullet in bullets_to_remove:
-            self.bullets.remove(bullet)
+        # Update bullets (inactive ones are simply left unused in the pool)
+        self.bullets.update(self.obstacle_aabb)
         
         # Check bullet hits on player
         if self.player and self.player.alive:
-            for bullet in self.bullets[:]:  # Use slice to avoid modification during iteration
-                if bullet.check_hit_player(self.player):
-                    self.player.die()
-                    reward += config.DEATH_PENALTY
-                    done = True
-                    info["death"] = True
-                    info["hit_by_bullet"] = True
-                    bullet.active = False
-                    break
+            if self.bullets.check_hit_player(self.player):
+                self.player.die()
+                reward += config.DEATH_PENALTY
+                done = True
+                info["death"] = True
+                info["hit_by_bullet"] = True
         
         # Update player attack animation
         if self.player and self.player.alive:
@@ -235,6 +273,7 @@ class HunterAssassinEnv(arcade.Window):
                 # Deal damage at the right moment in animation
                 if self.player.attack_target and self.player.attack_target.alive:
                     self.player.attack_target.die()
+                    self.enemies_alive -= 1
                     self.player.kills += 1
                     reward += config.PLAYER_KILL_REWARD
                     info["kill"] = True
@@ -258,8 +297,7 @@ class HunterAssassinEnv(arcade.Window):
         reward += config.STEP_PENALTY
         
         # Check win condition
-        enemies_alive = sum(1 for e in self.enemies if e.alive)
-        if enemies_alive == 0:
+        if self.enemies_alive == 0:
             reward += config.WIN_REWARD
             done = True
             info["win"] = True
@@ -272,6 +310,8 @@ class HunterAssassinEnv(arcade.Window):
         self.total_reward += reward
         info["total_reward"] = self.total_reward
         
+        if done and config.ZERO_TERMINAL_OBSERVATION:
+            return np.zeros(self.get_observation_space_size(), dtype=self.OBSERVATION_DTYPE), reward, done, info
         return self._get_observation(), reward, done, info
     
     def _get_observation(self) -> np.ndarray:
@@ -289,70 +329,71 @@ class HunterAssassinEnv(arcade.Window):
                     - Alive status
                     - Alerted status
         """
-        obs = []
+        num_rays = config.NUM_RAYS
+        enemy_list = list(self.enemies)
+        num_enemies = self.OBSERVED_ENEMIES
+        if num_enemies is None:
+            num_enemies = len(enemy_list)
+        # Filled in place; a new array per call, as callers keep past observations
+        obs = np.empty(num_rays + 3 + num_enemies * 5, dtype=np.float32)
         
         # Ray casting for distance sensing
         if self.player:
-            for i in range(config.NUM_RAYS):
-                angle = (360 / config.NUM_RAYS) * i
-                distance, _ = cast_ray(
-                    self.player.center_x, self.player.center_y,
-                    angle, config.RAY_MAX_DISTANCE,
-                    list(self.obstacles)
-                )
-                # Normalize distance
-                obs.append(distance / config.RAY_MAX_DISTANCE)
+            # All rays in one kernel call, against the obstacles within their reach
+            px, py = self.player.center_x, self.player.center_y
+            distances = ray_distances_nb(
+                px, py, self.RAY_DIR_X, self.RAY_DIR_Y, config.RAY_MAX_DISTANCE,
+                self.obstacle_index.query_aabb(px, py, config.RAY_MAX_DISTANCE)
+            )
+            # Normalize distance
+            obs[:num_rays] = distances / config.RAY_MAX_DISTANCE
             
-            # Player position (normalized)
-            obs.append(self.player.center_x / config.SCREEN_WIDTH)
-            obs.append(self.player.center_y / config.SCREEN_HEIGHT)
-            obs.append(1.0 if self.player.alive else 0.0)
+            # Player position (normalized) and alive status
+            obs[num_rays] = px / config.SCREEN_WIDTH
+            obs[num_rays + 1] = py / config.SCREEN_HEIGHT
+            obs[num_rays + 2] = 1.0 if self.player.alive else 0.0
         else:
             # Dead player
-            obs.extend([1.0] * config.NUM_RAYS)  # Max distance
-            obs.extend([0.0, 0.0, 0.0])  # Position and alive status
+            obs[:num_rays] = 1.0  # Max distance
+            obs[num_rays:num_rays + 3] = 0.0  # Position and alive status
         
-        # Enemy information
-        enemy_list = list(self.enemies)
-        num_enemies = getattr(config, 'NUM_GUARDS', getattr(config, 'NUM_ENEMIES', len(enemy_list)))
-        for i in range(num_enemies):
-            if i < len(enemy_list):
-                enemy = enemy_list[i]
-                if self.player:
-                    # Relative position
-                    rel_x = (enemy.center_x - self.player.center_x) / config.SCREEN_WIDTH
-                    rel_y = (enemy.center_y - self.player.center_y) / config.SCREEN_HEIGHT
-                    distance = get_distance(self.player.center_x, self.player.center_y,
-                                          enemy.center_x, enemy.center_y)
-                    norm_distance = min(distance / config.SCREEN_WIDTH, 1.0)
-                    
-                    obs.extend([
-                        rel_x,
-                        rel_y,
-                        norm_distance,
-                        1.0 if enemy.alive else 0.0,
-                        1.0 if enemy.state in ["chase", "alert"] else 0.0
-                    ])
-                else:
-                    obs.extend([0.0, 0.0, 1.0, 0.0, 0.0])
-            else:
-                # Padding for missing enemies
-                obs.extend([0.0, 0.0, 1.0, 0.0, 0.0])
-        
-        return np.array(obs, dtype=np.float32)
+        # Enemy information, one row per enemy slot
+        enemy_obs = obs[num_rays + 3:].reshape(num_enemies, 5)
+        # Padding for missing enemies (and every enemy when there is no player)
+        enemy_obs[:] = (0.0, 0.0, 1.0, 0.0, 0.0)
+        if self.player:
+            # A plain loop, one row write per enemy: for the handful of enemies
+            # on a level, gathering them into arrays first costs more than it saves
+            alerted_states = Enemy.ALERTED_STATES
+            for i, enemy in enumerate(enemy_list[:num_enemies]):
+                offset_x = enemy.center_x - px
+                offset_y = enemy.center_y - py
+                # Relative position, normalized distance, alive and alerted status
+                enemy_obs[i] = (offset_x / config.SCREEN_WIDTH,
+                                offset_y / config.SCREEN_HEIGHT,
+                                min(math.hypot(offset_x, offset_y) / config.SCREEN_WIDTH, 1.0),
+                                1.0 if enemy.alive else 0.0,
+                                1.0 if enemy.state in alerted_states else 0.0)
+        
+        if self.OBSERVATION_DTYPE == np.int8:
+            # Every feature lies in [-1, 1]: store it as a signed byte
+            return np.rint(obs * 127).astype(np.int8)
+        return obs.astype(self.OBSERVATION_DTYPE, copy=False)
     
     def _get_min_enemy_distance(self) -> float:
         """Get distance to nearest alive enemy."""
-        if not self.player or not self.player.alive:
+        if not self.player or not self.player.alive or self.enemies_alive == 0:
             return float('inf')
         
-        min_dist = float('inf')
+        # Compare squared distances; a single sqrt for the nearest one
+        px, py = self.player.center_x, self.player.center_y
+        min_dist_sq = float('inf')
         for enemy in self.enemies:
             if enemy.alive:
-                dist = get_distance(self.player.center_x, self.player.center_y,
-                                  enemy.center_x, enemy.center_y)
-                min_dist = min(min_dist, dist)
-        return min_dist
+                dist_sq = get_distance_sq(px, py, enemy.center_x, enemy.center_y)
+                if dist_sq < min_dist_sq:
+                    min_dist_sq = dist_sq
+        return math.sqrt(min_dist_sq)
     
     def _generate_json_map(self):
         """Generate map from JSON file."""
@@ -376,6 +417,7 @@ class HunterAssassinEnv(arcade.Window):
                         config.WALL_COLOR
                     )
                     self.obstacles.append(obstacle)
+        self._index_obstacles()
         
         # Create player at spawn
         player_tile_x, player_tile_y = map_data.player_start
@@ -406,6 +448,7 @@ class HunterAssassinEnv(arcade.Window):
                 wall_def['color']
             )
             self.obstacles.append(obstacle)
+        self._index_obstacles()
         
         # Create player at fixed spawn
         player_x, player_y = layout.get_player_spawn()
@@ -422,6 +465,7 @@ class HunterAssassinEnv(arcade.Window):
         """Generate random obstacles and spawn positions (original behavior)."""
         # Generate obstacles
         self._generate_obstacles()
+        self._index_obstacles()
         
         # Create player
         player_x, player_y = self._find_valid_spawn_position()
@@ -447,25 +491,36 @@ class HunterAssassinEnv(arcade.Window):
             obstacle = Obstacle(x, y, width, height)
             self.obstacles.append(obstacle)
     
+    def _index_obstacles(self):
+        """
+        Index the level's obstacles once they are all placed.
+        
+        Obstacles are static for the whole episode, so every map generator
+        calls this exactly once, before spawning anything on the level.
+        """
+        self.obstacle_index.rebuild(self.obstacles)
+        self.obstacle_aabb = self.obstacle_index.aabb
+    
     def _find_valid_spawn_position(self, min_distance_from_player: float = 0) -> Tuple[float, float]:
         """Find a valid spawn position that doesn't overlap with obstacles."""
         max_attempts = 100
+        boxes = self.obstacle_index.boxes
         for _ in range(max_attempts):
             x = random.randint(50, config.SCREEN_WIDTH - 50)
             y = random.randint(50, config.SCREEN_HEIGHT - 50)
             
             # Check obstacle collision
             valid = True
-            for obstacle in self.obstacles:
-                if (obstacle.left - 30 <= x <= obstacle.right + 30 and
-                    obstacle.bottom - 30 <= y <= obstacle.top + 30):
+            for left, right, bottom, top in boxes:
+                if (left - 30 <= x <= right + 30 and
+                    bottom - 30 <= y <= top + 30):
                     valid = False
                     break
             
             # Check distance from player if needed
             if valid and self.player and min_distance_from_player > 0:
-                dist = get_distance(x, y, self.player.center_x, self.player.center_y)
-                if dist < min_distance_from_player:
+                dist_sq = get_distance_sq(x, y, self.player.center_x, self.player.center_y)
+                if dist_sq < min_distance_from_player * min_distance_from_player:
                     valid = False
             
             if valid:
@@ -493,29 +548,19 @@ class HunterAssassinEnv(arcade.Window):
         self.clear()
         
         # Draw floor background
-        if config.USE_JSON_MAP or (hasattr(config, 'USE_APARTMENT_LAYOUT') and config.USE_APARTMENT_LAYOUT):
-            # Draw floor with subtle grid pattern
-            arcade.draw_lrbt_rectangle_filled(
-                0, config.SCREEN_WIDTH,
-                0, config.SCREEN_HEIGHT,
-                config.FLOOR_COLOR
-            )
-            
-            # Draw subtle grid lines for floor texture
-            grid_size = config.TILE_SIZE if hasattr(config, 'TILE_SIZE') else 80
-            grid_color = tuple(min(255, c + 5) for c in config.FLOOR_COLOR)
-            
-            # Vertical lines
-            for x in range(0, config.SCREEN_WIDTH, grid_size):
-                arcade.draw_line(x, 0, x, config.SCREEN_HEIGHT, grid_color, 1)
-            
-            # Horizontal lines
-            for y in range(0, config.SCREEN_HEIGHT, grid_size):
-                arcade.draw_line(0, y, config.SCREEN_WIDTH, y, grid_color, 1)
-        
-        # Draw obstacles
-        for obstacle in self.obstacles:
-            obstacle.draw_colored()
+        if self.DRAW_FLOOR:
+            if self.floor_shapes is None:
+                self.floor_shapes = self._create_floor_shapes()
+            self.floor_shapes.draw()
+        
+        # Draw obstacles: static, so their shapes are uploaded once per level
+        if self.obstacle_shapes_version != self.obstacle_index.version:
+            self.obstacle_shapes_version = self.obstacle_index.version
+            self.obstacle_shapes = arcade.shape_list.ShapeElementList()
+            for obstacle in self.obstacles:
+                for shape in obstacle.create_shapes():
+                    self.obstacle_shapes.append(shape)
+        self.obstacle_shapes.draw()
 
         
         # Draw enemy vision cones with gradient effect
@@ -527,37 +572,41 @@ class HunterAssassinEnv(arcade.Window):
                     angle_start = enemy.vision_angle - enemy.fov / 2
                     angle_end = enemy.vision_angle + enemy.fov / 2
                     
-                    # Draw 3 layers for gradient effect
-                    layers = [
-                        (enemy.vision_range * 1.0, (255, 255, 0, 20)),  # Full range, very transparent
-                        (enemy.vision_range * 0.7, (255, 200, 0, 30)),  # 70% range, more visible
-                        (enemy.vision_range * 0.4, (255, 150, 0, 40)),  # 40% range, most visible
-                    ]
-                    
-                    for radius, color in layers:
-                        # Draw the vision cone as a filled arc/wedge
-                        self._draw_vision_cone(
-                            enemy.center_x, enemy.center_y,
-                            radius, angle_start, angle_end, color
-                        )
+                    # Draw the vision cone as filled arcs/wedges, in 3 layers
+                    self._draw_vision_cone(
+                        enemy.center_x, enemy.center_y,
+                        enemy.vision_range, angle_start, angle_end
+                    )
                     
                     # Draw vision direction line (the "aiming" line)
-                    angle_rad = math.radians(enemy.vision_angle)
-                    end_x = enemy.center_x + math.cos(angle_rad) * 40
-                    end_y = enemy.center_y + math.sin(angle_rad) * 40
+                    forward_x, forward_y = enemy.forward
+                    end_x = enemy.center_x + forward_x * 40
+                    end_y = enemy.center_y + forward_y * 40
                     arcade.draw_line(
                         enemy.center_x, enemy.center_y,
                         end_x, end_y,
-                        (255, 200, 0) if enemy.can_see_player else (200, 200, 0), 3
+                        self.AIM_LINE_SEEN_COLOR if enemy.can_see_player else self.AIM_LINE_COLOR, 3
                     )
         
         # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw_colored()
+        alive_enemies = [enemy for enemy in self.enemies if enemy.alive]
+        enemy_radius = alive_enemies[0].radius if alive_enemies else 0
+        draw_circle_batch(self.enemy_sprites,
+                          [enemy.center_x for enemy in alive_enemies],
+                          [enemy.center_y for enemy in alive_enemies],
+                          enemy_radius, arcade.color.WHITE,
+                          colors=[enemy.color for enemy in alive_enemies])
+        
+        # Draw muzzle flashes
+        flashes = [pos for pos in (enemy.muzzle_flash_position() for enemy in self.enemies)
+                   if pos is not None]
+        flash_xs = [x for x, _ in flashes]
+        flash_ys = [y for _, y in flashes]
+        draw_circle_batch(self.flash_outer_sprites, flash_xs, flash_ys, 8, (255, 255, 200))
+        draw_circle_batch(self.flash_inner_sprites, flash_xs, flash_ys, 5, (255, 255, 100))
         
         # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw_colored()
+        self.bullets.draw_colored()
         
         # Draw player
         if self.player:
@@ -598,44 +647,66 @@ class HunterAssassinEnv(arcade.Window):
         # Draw UI
         self._draw_ui()
 
-    def _draw_vision_cone(self, center_x: float, center_y: float,
-                          radius: float, angle_start: float, angle_end: float,
-                          color: Tuple[int, int, int, int]):
+    def _create_floor_shapes(self) -> arcade.shape_list.ShapeElementList:
         """
-        Draw a filled vision cone that stops at walls.
+        Build the floor with its subtle grid pattern, drawn in a single call.
+        
+        Returns:
+            ShapeElementList of the floor fill and every grid line
+        """
+        floor_shapes = arcade.shape_list.ShapeElementList()
+        floor_shapes.append(arcade.shape_list.create_rectangle_filled(
+            config.SCREEN_WIDTH / 2, config.SCREEN_HEIGHT / 2,
+            config.SCREEN_WIDTH, config.SCREEN_HEIGHT,
+            config.FLOOR_COLOR
+        ))
+        
+        # Grid lines for floor texture, as (start, end) point pairs
+        grid_size = self.FLOOR_GRID_SIZE
+        points = []
+        # Vertical lines
+        for x in range(0, config.SCREEN_WIDTH, grid_size):
+            points += [(x, 0), (x, config.SCREEN_HEIGHT)]
+        # Horizontal lines
+        for y in range(0, config.SCREEN_HEIGHT, grid_size):
+            points += [(0, y), (config.SCREEN_WIDTH, y)]
+        floor_shapes.append(arcade.shape_list.create_lines(points, self.FLOOR_GRID_COLOR))
+        return floor_shapes
+    
+    def _draw_vision_cone(self, center_x: float, center_y: float, radius: float,
+                          angle_start: float, angle_end: float):
+        """
+        Draw a filled vision cone that stops at walls, as the VISION_LAYERS gradient.
+
+        The rays are cast once, at the full radius: a shorter layer stops
+        at the same wall, or at its own radius.
 
         Args:
             center_x, center_y: Center point of the cone
             radius: Radius of the cone
             angle_start: Starting angle in degrees
             angle_end: Ending angle in degrees
-            color: RGBA color tuple
         """
-        # Create points for the cone/wedge
-        points = [(center_x, center_y)]  # Start at center
-
         # Number of segments for smooth arc
         num_segments = max(3, int(abs(angle_end - angle_start) / 5))
+        # Only the obstacles within the cone's radius can stop its rays
+        nearby_aabb = self.obstacle_index.query_aabb(center_x, center_y, radius)
 
-        # Add points along the arc, but ray cast to find wall intersections
-        for i in range(num_segments + 1):
-            angle = angle_start + (angle_end - angle_start) * i / num_segments
+        # Ray cast every arc point in one kernel call to find wall intersections
+        angles = np.radians(np.linspace(angle_start, angle_end, num_segments + 1))
+        dir_x = np.cos(angles)
+        dir_y = np.sin(angles)
+        distances = ray_distances_nb(center_x, center_y, dir_x, dir_y, radius, nearby_aabb)
 
-            # Cast a ray to find where it hits a wall
-            distance, hit_point = cast_ray(
-                center_x, center_y,
-                angle, radius,
-                list(self.obstacles)
-            )
+        for fraction, color in self.VISION_LAYERS:
+            # Use the hit points (which stop at walls), starting at the center
+            layer_distances = np.minimum(distances, radius * fraction)
+            xs = (center_x + dir_x * layer_distances).tolist()
+            ys = (center_y + dir_y * layer_distances).tolist()
+            points = [(center_x, center_y)] + list(zip(xs, ys))
 
-            # Use the hit point (which stops at walls)
-            angle_rad = math.radians(angle)
-            x = center_x + math.cos(angle_rad) * distance
-            y = center_y + math.sin(angle_rad) * distance
-            points.append((x, y))
-
-        # Draw filled polygon
-        arcade.draw_polygon_filled(points, color)
+            # Draw filled polygon
+            arcade.draw_polygon_filled(points, color)
     
     def _draw_ui(self):
         """Draw UI elements."""
@@ -646,30 +717,41 @@ class HunterAssassinEnv(arcade.Window):
             self.text_start_hint.draw()
         
         # Score
-        self.text_kills.text = f"Kills: {self.player.kills if self.player else 0}"
+        self._set_ui_text(self.text_kills, "Kills: {}", self.player.kills if self.player else 0)
         self.text_kills.draw()
         
         # Enemies alive
-        enemies_alive = sum(1 for e in self.enemies if e.alive)
-        total_enemies = len(self.enemies)
-        self.text_guards.text = f"Guards: {enemies_alive}/{total_enemies}"
+        self._set_ui_text(self.text_guards, "Guards: {}/{}", self.enemies_alive, len(self.enemies))
         self.text_guards.draw()
         
         # Episode step
-        self.text_step.text = f"Step: {self.episode_step}/{config.MAX_STEPS_PER_EPISODE}"
+        self._set_ui_text(self.text_step, "Step: {}/{}", self.episode_step, config.MAX_STEPS_PER_EPISODE)
         self.text_step.draw()
         
         # Total reward
-        self.text_reward.text = f"Reward: {self.total_reward:.1f}"
+        self._set_ui_text(self.text_reward, "Reward: {:.1f}", self.total_reward)
         self.text_reward.draw()
         
         # Bullets count (for debugging)
-        self.text_bullets.text = f"Bullets: {len(self.bullets)}"
+        self._set_ui_text(self.text_bullets, "Bullets: {}", len(self.bullets))
         self.text_bullets.draw()
         
         # Controls hint
         self.text_controls.draw()
     
+    def _set_ui_text(self, label: arcade.Text, template: str, *values):
+        """
+        Reformat a UI label only when the values it shows have changed.
+        
+        Args:
+            label: Text object to update
+            template: str.format template filled with the values
+            *values: Values shown by the label
+        """
+        if self.ui_values.get(label) != values:
+            self.ui_values[label] = values
+            label.text = template.format(*values)
+    
     def on_update(self, delta_time: float):
         """Update game state (for manual play mode)."""
         if not self.player or not self.player.alive:
@@ -677,27 +759,10 @@ class HunterAssassinEnv(arcade.Window):
         
         # Update point-and-click movement first
         if self.player.target_position and not self.player.is_attacking:
-            self.player.update_movement(list(self.obstacles), 
+            self.player.update_movement(self.obstacle_index, 
                                        config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
         
-        # Update idle animation if not moving and not attacking
-        if not self.player.target_position and not self.player.is_attacking:
-            # Check if any keys are pressed
-            dx, dy = 0, 0
-            if self.key_state[arcade.key.W] or self.key_state[arcade.key.UP]:
-                dy = 1
-            if self.key_state[arcade.key.S] or self.key_state[arcade.key.DOWN]:
-                dy = -1
-            if self.key_state[arcade.key.A] or self.key_state[arcade.key.LEFT]:
-                dx = -1
-            if self.key_state[arcade.key.D] or self.key_state[arcade.key.RIGHT]:
-                dx = 1
-            
-            if dx == 0 and dy == 0:
-                # No movement, update idle animation
-                self.player.animated_sprite.update_animation(0, 0)
-        
-        # Get action from keyboard (overrides click movement)
+        # Direction from keyboard (overrides click movement)
         dx, dy = 0, 0
         if self.key_state[arcade.key.W] or self.key_state[arcade.key.UP]:
             dy = 1
@@ -708,6 +773,12 @@ class HunterAssassinEnv(arcade.Window):
         if self.key_state[arcade.key.D] or self.key_state[arcade.key.RIGHT]:
             dx = 1
         
+        # Update idle animation if not moving and not attacking
+        if not self.player.target_position and not self.player.is_attacking:
+            if dx == 0 and dy == 0:
+                # No movement, update idle animation
+                self.player.animated_sprite.update_animation(0, 0)
+        
         # Convert to action index
         action = self._get_action_from_direction(dx, dy)
         
@@ -716,10 +787,7 @@ class HunterAssassinEnv(arcade.Window):
     
     def _get_action_from_direction(self, dx: int, dy: int) -> int:
         """Convert direction to action index."""
-        for action_idx, (action_dx, action_dy) in config.ACTIONS.items():
-            if action_dx == dx and action_dy == dy:
-                return action_idx
-        return 0  # Stay still
+        return self.ACTION_BY_DIRECTION.get((dx, dy), 0)  # Unknown: stay still
     
     def on_key_press(self, key: int, modifiers: int):
         """Handle key press events."""
@@ -743,7 +811,7 @@ class HunterAssassinEnv(arcade.Window):
             # Set target position for player with pathfinding
             self.player.set_target(
                 x, y,
-                list(self.obstacles),
+                self.obstacle_index,
                 self.grid_width,
                 self.grid_height,
                 self.tile_size
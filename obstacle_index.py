@@ -0,0 +1,109 @@
+"""
+Uniform-grid broadphase index over the (static) obstacles of a level
+"""
+import itertools
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from utils import build_obstacle_aabb
+
+# Obstacle bounds: (left, right, bottom, top)
+Box = Tuple[float, float, float, float]
+
+# Source of ObstacleIndex.version: unique across every index and rebuild
+_versions = itertools.count()
+
+
+class ObstacleIndex:
+    """
+    Buckets obstacles by the grid cells their bounding box overlaps.
+
+    Iterating the index yields every obstacle, so it can be passed anywhere
+    a list of obstacles is expected; collision tests use query() to only
+    visit the bounds of the obstacles near a point.
+    """
+
+    # Below this many obstacles a plain scan beats the cell lookups
+    MIN_INDEXED_OBSTACLES = 32
+
+    def __init__(self, obstacles, cell_size: float = 64):
+        """
+        Build the index once the level's obstacles are placed.
+
+        Args:
+            obstacles: Iterable of Obstacle sprites
+            cell_size: Size of a grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self.rebuild(obstacles)
+
+    def rebuild(self, obstacles):
+        """
+        Re-index a new set of obstacles in place.
+
+        Every structure derived from the obstacles is rebuilt here, and
+        version changes, so caches held elsewhere can tell they are stale.
+
+        Args:
+            obstacles: Iterable of Obstacle sprites
+        """
+        self.version: int = next(_versions)
+        self.obstacles: List = list(obstacles)
+        self.aabb = build_obstacle_aabb(self.obstacles)
+        # Same bounds as plain float tuples: cheaper than sprite attributes
+        # or NumPy scalars in interpreted loops
+        self.boxes: List[Box] = [tuple(row) for row in self.aabb.tolist()]
+        self.buckets: Dict[Tuple[int, int], List[Box]] = {}
+        # find_path() results for this level, keyed by start and goal tiles
+        self.path_cache: Dict[tuple, Optional[List[Tuple[float, float]]]] = {}
+
+        for box in self.boxes:
+            for cell in self._cells(*box):
+                self.buckets.setdefault(cell, []).append(box)
+
+    def __iter__(self):
+        return iter(self.obstacles)
+
+    def __len__(self) -> int:
+        return len(self.obstacles)
+
+    def _cells(self, left: float, right: float, bottom: float, top: float):
+        """Yield the grid cells overlapped by a bounding box."""
+        size = self.cell_size
+        for ix in range(int(left // size), int(right // size) + 1):
+            for iy in range(int(bottom // size), int(top // size) + 1):
+                yield ix, iy
+
+    def query(self, x: float, y: float, radius: float) -> List[Box]:
+        """
+        Get the bounds of the obstacles that may touch a circle.
+
+        Args:
+            x, y: Circle center
+            radius: Circle radius
+
+        Returns:
+            (left, right, bottom, top) of obstacles whose cells overlap
+            the circle's bounding box
+        """
+        if len(self.boxes) < self.MIN_INDEXED_OBSTACLES:
+            return self.boxes
+
+        size = self.cell_size
+        ix0, ix1 = int((x - radius) // size), int((x + radius) // size)
+        iy0, iy1 = int((y - radius) // size), int((y + radius) // size)
+        if ix0 == ix1 and iy0 == iy1:
+            return self.buckets.get((ix0, iy0), [])
+
+        found = {}  # Ordered set: an obstacle can span several cells
+        for cell in self._cells(x - radius, x + radius, y - radius, y + radius):
+            for box in self.buckets.get(cell, ()):
+                found[box] = None
+        return list(found)
+
+    def query_aabb(self, x: float, y: float, radius: float) -> np.ndarray:
+        """
+        Same as query(), packed as an (N, 4) float32 array for the Numba kernels.
+        """
+        if len(self.boxes) < self.MIN_INDEXED_OBSTACLES:
+            return self.aabb
+        return np.array(self.query(x, y, radius), dtype=np.float32).reshape(-1, 4)
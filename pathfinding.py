@@ -3,28 +3,53 @@ A* Pathfinding for Hunter Assassin game
 Finds optimal path through tile-based maze
 """
 import math
-from typing import List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional
 import heapq
 
+# Maximum number of cached searches kept per level before the cache is reset
+PATH_CACHE_SIZE = 4096
 
-class Node:
-    """Node for A* pathfinding"""
-    def __init__(self, x: int, y: int, g: float = 0, h: float = 0, parent: Optional['Node'] = None):
-        self.x = x
-        self.y = y
-        self.g = g  # Cost from start
-        self.h = h  # Heuristic to goal
-        self.f = g + h  # Total cost
-        self.parent = parent
-    
-    def __lt__(self, other):
-        return self.f < other.f
-    
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+
+class AStarContext:
+    """
+    Scratch buffers reused by every A* search on a grid of a given size.
+
+    Tiles are indexed as y * grid_width + x in flat lists, so a search does
+    no per-call dict/set allocation; reset() restores them with slice copies.
+    """
+    def __init__(self, grid_width: int, grid_height: int):
+        size = grid_width * grid_height
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self._inf = [math.inf] * size
+        self._false = [False] * size
+        self.g_score: List[float] = list(self._inf)
+        self.closed: List[bool] = list(self._false)
+        # Parent tile of each reached tile (-1: none); stale entries are
+        # never read because a tile is only followed after being reached
+        self.came_from: List[int] = [-1] * size
+        # Heap of (f, tile): plain tuples, no node objects
+        self.open_set: List[Tuple[float, int]] = []
     
-    def __hash__(self):
-        return hash((self.x, self.y))
+    def reset(self):
+        """Forget the previous search."""
+        self.g_score[:] = self._inf
+        self.closed[:] = self._false
+        self.open_set.clear()
+
+
+# One context per grid size, shared by all searches
+_contexts: Dict[Tuple[int, int], AStarContext] = {}
+
+
+def get_astar_context(grid_width: int, grid_height: int) -> AStarContext:
+    """Get the shared, reset AStarContext for a grid size."""
+    ctx = _contexts.get((grid_width, grid_height))
+    if ctx is None:
+        ctx = _contexts[(grid_width, grid_height)] = AStarContext(grid_width, grid_height)
+    else:
+        ctx.reset()
+    return ctx
 
 
 def heuristic(x1: int, y1: int, x2: int, y2: int) -> float:
@@ -46,14 +71,14 @@ def grid_to_world(grid_x: int, grid_y: int, tile_size: int) -> Tuple[float, floa
     return (world_x, world_y)
 
 
-def is_walkable_grid(grid_x: int, grid_y: int, obstacles: List, tile_size: int, player_radius: float) -> bool:
+def is_walkable_grid(grid_x: int, grid_y: int, obstacles: 'ObstacleIndex', tile_size: int, player_radius: float) -> bool:
     """
     Check if a grid position is walkable (no obstacles).
     Takes into account the player's size by checking multiple points around the tile center.
     
     Args:
         grid_x, grid_y: Grid coordinates
-        obstacles: List of Obstacle sprites
+        obstacles: ObstacleIndex of the level's obstacles
         tile_size: Size of each tile in pixels
         player_radius: Radius of the player character
     """
@@ -77,19 +102,20 @@ def is_walkable_grid(grid_x: int, grid_y: int, obstacles: List, tile_size: int,
         (world_x - check_radius * 0.707, world_y - check_radius * 0.707),  # Bottom-left
     ]
     
-    # Check if any point of the player's body would collide with obstacles
+    # Check if any point of the player's body would collide with nearby obstacles
+    nearby = obstacles.query(world_x, world_y, check_radius)
     for check_x, check_y in check_points:
-        for obstacle in obstacles:
+        for left, right, bottom, top in nearby:
             # Check if this point is inside the obstacle
-            if (obstacle.left <= check_x <= obstacle.right and
-                obstacle.bottom <= check_y <= obstacle.top):
+            if (left <= check_x <= right and
+                bottom <= check_y <= top):
                 return False
     
     return True
 
 
 def get_neighbors(x: int, y: int, grid_width: int, grid_height: int, 
-                  obstacles: List = None, tile_size: int = None, 
+                  obstacles: 'ObstacleIndex' = None, tile_size: int = None, 
                   player_radius: float = None) -> List[Tuple[int, int, float]]:
     """
     Get walkable neighbors for a grid position.
@@ -155,7 +181,7 @@ def get_neighbors(x: int, y: int, grid_width: int, grid_height: int,
 
 def find_path(start_x: float, start_y: float, 
               goal_x: float, goal_y: float,
-              obstacles: List, 
+              obstacles: 'ObstacleIndex', 
               tile_size: int,
               grid_width: int, 
               grid_height: int,
@@ -167,20 +193,46 @@ def find_path(start_x: float, start_y: float,
     Args:
         start_x, start_y: Starting world coordinates
         goal_x, goal_y: Goal world coordinates
-        obstacles: List of obstacle sprites
+        obstacles: ObstacleIndex of the level's obstacles
         tile_size: Size of each tile in pixels
         grid_width, grid_height: Grid dimensions
         player_radius: Radius of the player character
         max_distance: Optional maximum path length (in tiles)
     
     Returns:
-        List of (world_x, world_y) waypoints, or None if no path found
+        List of (world_x, world_y) waypoints, or None if no path found.
+        The list may be shared with other callers and must not be modified.
     """
     # Convert to grid coordinates
     start_grid = world_to_grid(start_x, start_y, tile_size)
     goal_grid = world_to_grid(goal_x, goal_y, tile_size)
     
+    # The search only depends on the tiles, so every query between the same
+    # two tiles (e.g. several guards chasing the player) shares one result
+    cache = getattr(obstacles, 'path_cache', None)
+    if cache is None:
+        return _find_grid_path(start_grid, goal_grid, obstacles, tile_size,
+                               grid_width, grid_height, player_radius, max_distance)
+    
+    key = (start_grid, goal_grid, tile_size, grid_width, grid_height,
+           player_radius, max_distance)
+    if key not in cache:
+        if len(cache) >= PATH_CACHE_SIZE:
+            cache.clear()
+        cache[key] = _find_grid_path(start_grid, goal_grid, obstacles, tile_size,
+                                     grid_width, grid_height, player_radius, max_distance)
+    return cache[key]
+
+
+def _find_grid_path(start_grid: Tuple[int, int], goal_grid: Tuple[int, int],
+                    obstacles: 'ObstacleIndex', tile_size: int,
+                    grid_width: int, grid_height: int, player_radius: float,
+                    max_distance: Optional[float]) -> Optional[List[Tuple[float, float]]]:
+    """A* search between two grid tiles; see find_path()."""
     # Check if start and goal are valid
+    if not (0 <= start_grid[0] < grid_width and 0 <= start_grid[1] < grid_height):
+        return None
+    
     if not is_walkable_grid(start_grid[0], start_grid[1], obstacles, tile_size, player_radius):
         return None
     
@@ -191,27 +243,32 @@ def find_path(start_x: float, start_y: float,
         if goal_grid is None:
             return None
     
-    # A* algorithm
-    open_set = []
-    start_node = Node(start_grid[0], start_grid[1], 0, 
-                     heuristic(start_grid[0], start_grid[1], goal_grid[0], goal_grid[1]))
-    heapq.heappush(open_set, start_node)
+    # A* algorithm, on the shared scratch buffers
+    ctx = get_astar_context(grid_width, grid_height)
+    open_set = ctx.open_set
+    closed = ctx.closed
+    g_scores = ctx.g_score
+    came_from = ctx.came_from
+    start_tile = start_grid[1] * grid_width + start_grid[0]
+    
+    goal_x, goal_y = goal_grid
+    goal_tile = goal_y * grid_width + goal_x
     
-    closed_set: Set[Tuple[int, int]] = set()
-    g_scores = {(start_grid[0], start_grid[1]): 0}
+    heapq.heappush(open_set, (heuristic(start_grid[0], start_grid[1], goal_x, goal_y), start_tile))
+    g_scores[start_tile] = 0
     
     while open_set:
-        current = heapq.heappop(open_set)
+        _, current_tile = heapq.heappop(open_set)
         
         # Reached goal
-        if current.x == goal_grid[0] and current.y == goal_grid[1]:
-            # Reconstruct path
+        if current_tile == goal_tile:
+            # Reconstruct path by following the parent tiles back to the start
             path = []
-            node = current
-            while node is not None:
-                world_pos = grid_to_world(node.x, node.y, tile_size)
-                path.append(world_pos)
-                node = node.parent
+            tile = current_tile
+            while tile != start_tile:
+                path.append(grid_to_world(tile % grid_width, tile // grid_width, tile_size))
+                tile = came_from[tile]
+            path.append(grid_to_world(start_grid[0], start_grid[1], tile_size))
             path.reverse()
             
             # Simplify path (remove unnecessary waypoints)
@@ -219,12 +276,19 @@ def find_path(start_x: float, start_y: float,
             
             return path
         
-        closed_set.add((current.x, current.y))
+        # Stale entry: the tile was already expanded with a lower cost
+        if closed[current_tile]:
+            continue
+        closed[current_tile] = True
+        current_g = g_scores[current_tile]
+        current_x = current_tile % grid_width
+        current_y = current_tile // grid_width
         
         # Check neighbors (pass obstacles and player_radius for diagonal blocking)
-        for nx, ny, move_cost in get_neighbors(current.x, current.y, grid_width, grid_height,
+        for nx, ny, move_cost in get_neighbors(current_x, current_y, grid_width, grid_height,
                                                obstacles, tile_size, player_radius):
-            if (nx, ny) in closed_set:
+            tile = ny * grid_width + nx
+            if closed[tile]:
                 continue
             
             # Check if walkable
@@ -232,24 +296,24 @@ def find_path(start_x: float, start_y: float,
                 continue
             
             # Calculate costs
-            tentative_g = current.g + move_cost
+            tentative_g = current_g + move_cost
             
             # Optional: distance limit
             if max_distance and tentative_g > max_distance:
                 continue
             
             # Check if this path is better
-            if (nx, ny) not in g_scores or tentative_g < g_scores[(nx, ny)]:
-                g_scores[(nx, ny)] = tentative_g
-                h = heuristic(nx, ny, goal_grid[0], goal_grid[1])
-                neighbor = Node(nx, ny, tentative_g, h, current)
-                heapq.heappush(open_set, neighbor)
+            if tentative_g < g_scores[tile]:
+                g_scores[tile] = tentative_g
+                came_from[tile] = current_tile
+                h = heuristic(nx, ny, goal_x, goal_y)
+                heapq.heappush(open_set, (tentative_g + h, tile))
     
     # No path found
     return None
 
 
-def find_nearest_walkable(x: int, y: int, obstacles: List, tile_size: int,
+def find_nearest_walkable(x: int, y: int, obstacles: 'ObstacleIndex', tile_size: int,
                           grid_width: int, grid_height: int, player_radius: float,
                           max_radius: int = 5) -> Optional[Tuple[int, int]]:
     """Find nearest walkable tile to given position"""
@@ -264,7 +328,7 @@ def find_nearest_walkable(x: int, y: int, obstacles: List, tile_size: int,
     return None
 
 
-def simplify_path(path: List[Tuple[float, float]], obstacles: List, tile_size: int) -> List[Tuple[float, float]]:
+def simplify_path(path: List[Tuple[float, float]], obstacles: 'ObstacleIndex', tile_size: int) -> List[Tuple[float, float]]:
     """
     Simplify path by removing unnecessary waypoints.
     Uses line-of-sight checks to skip intermediate points.
@@ -292,7 +356,7 @@ def simplify_path(path: List[Tuple[float, float]], obstacles: List, tile_size: i
 
 
 def has_clear_path(start: Tuple[float, float], end: Tuple[float, float], 
-                   obstacles: List, tile_size: int) -> bool:
+                   obstacles: 'ObstacleIndex', tile_size: int) -> bool:
     """
     Check if there's a clear straight line between two points.
     Samples points along the line and checks for obstacles.
@@ -311,9 +375,9 @@ def has_clear_path(start: Tuple[float, float], end: Tuple[float, float],
         
         # Check if this point is in an obstacle
         radius = tile_size / 4
-        for obstacle in obstacles:
-            if (obstacle.left - radius <= test_x <= obstacle.right + radius and
-                obstacle.bottom - radius <= test_y <= obstacle.top + radius):
+        for left, right, bottom, top in obstacles.query(test_x, test_y, radius):
+            if (left - radius <= test_x <= right + radius and
+                bottom - radius <= test_y <= top + radius):
                 return False
     
     return True
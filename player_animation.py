@@ -232,6 +232,9 @@ class AnimatedPlayerSprite(arcade.Sprite):
         self.last_dx = 0
         self.last_dy = 0
         self.facing_angle = 0  # Angle the player is facing (in degrees)
+        # Texture and rotation updates; turned off for headless runs, where
+        # only the animation timing (attack damage frame) matters
+        self.update_visuals = True
         
         # Scale the sprite to be 0.75 of a tile (48 pixels)
         # Assuming sprites are around 289x224, we need to scale down significantly
@@ -264,6 +267,8 @@ class AnimatedPlayerSprite(arcade.Sprite):
         
         # Update the animation manager
         self.animation_manager.update(is_moving)
+        if not self.update_visuals:
+            return
         
         # Update the texture
         self.texture = self.animation_manager.get_current_texture()
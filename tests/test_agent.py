@@ -0,0 +1,45 @@
+"""SimpleAgent's batched Q-table updates."""
+import os
+
+os.environ.setdefault('ARCADE_HEADLESS', '1')
+
+import numpy as np
+
+from agent import SimpleAgent
+
+
+def _transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # A small corner of the grid, so transitions in one batch often share cells
+    states = rng.integers(0, 3, size=(n + 1, 2))
+    actions = rng.integers(0, 4, size=n)
+    rewards = rng.normal(size=n).astype(np.float32)
+    dones = rng.random(n) < 0.05
+    for i in range(n):
+        yield tuple(states[i]), int(actions[i]), float(rewards[i]), tuple(states[i + 1]), bool(dones[i])
+
+
+def _train(batch_size, n=500):
+    agent = SimpleAgent(batch_size=batch_size)
+    for transition in _transitions(n):
+        agent.learn(*transition)
+    agent.end_episode(0.0)  # Flushes the partial last batch
+    return agent.qtable
+
+
+def test_batched_updates_match_online_updates():
+    online = _train(batch_size=1)
+    assert np.any(online != 0.0)
+    for batch_size in (7, 64):
+        np.testing.assert_array_equal(_train(batch_size), online)
+
+
+def test_single_update():
+    agent = SimpleAgent(batch_size=1)
+    agent.qtable[1, 1] = (0.0, 2.0, 0.5, 1.0)
+    agent.learn((0, 0), 3, 1.0, (1, 1), False)
+    expected = agent.alpha * (np.float32(1.0) + agent.gamma * np.float32(2.0))
+    assert np.isclose(agent.qtable[0, 0, 3], expected)
+    
+    agent.learn((0, 0), 2, 1.0, (1, 1), True)  # Terminal: no bootstrap
+    assert np.isclose(agent.qtable[0, 0, 2], agent.alpha * np.float32(1.0))
@@ -0,0 +1,47 @@
+"""Regression tests for the slab-test ray kernels in utils_numba."""
+import math
+
+import numpy as np
+
+from utils_numba import line_of_sight_nb, ray_distance_nb, ray_distances_nb
+
+# Box [224, 280] x [112, 168]; a 135 degree ray from (308, 140) runs
+# exactly through its (280, 168) corner
+CORNER_BOX = np.array([[224, 280, 112, 168]], dtype=np.float32)
+ORIGIN = (308.0, 140.0)
+CORNER_DISTANCE = 28.0 * math.sqrt(2.0)
+
+
+def test_ray_through_corner_hits():
+    angle = math.radians(135.0)
+    distance = ray_distance_nb(ORIGIN[0], ORIGIN[1], math.cos(angle), math.sin(angle),
+                               300.0, CORNER_BOX)
+    assert math.isclose(distance, CORNER_DISTANCE, rel_tol=1e-6)
+
+
+def test_ray_fan_through_corner_hits():
+    # Observation rays: ray 6 of 16 is the 135 degree one
+    angles = np.radians(np.arange(16) * 22.5)
+    distances = ray_distances_nb(ORIGIN[0], ORIGIN[1], np.cos(angles), np.sin(angles),
+                                 300.0, CORNER_BOX)
+    assert math.isclose(distances[6], CORNER_DISTANCE, rel_tol=1e-6)
+
+
+def test_line_of_sight_through_corner_is_blocked():
+    assert not line_of_sight_nb(ORIGIN[0], ORIGIN[1], 208.0, 240.0, CORNER_BOX)
+
+
+def test_ray_past_corner_misses():
+    angle = math.radians(134.0)
+    distance = ray_distance_nb(ORIGIN[0], ORIGIN[1], math.cos(angle), math.sin(angle),
+                               300.0, CORNER_BOX)
+    assert distance == 300.0
+
+
+def test_ray_along_edge_hits():
+    # 180 degrees along the box's top edge: cos/sin leave a 1e-16 sideways
+    # component that must not push the ray off the edge
+    angle = math.radians(180.0)
+    distance = ray_distance_nb(300.0, 168.0, math.cos(angle), math.sin(angle),
+                               300.0, CORNER_BOX)
+    assert math.isclose(distance, 20.0, rel_tol=1e-6)
@@ -0,0 +1,57 @@
+"""
+Player and Enemy list their fields in __slots__.
+
+arcade's PymunkMixin still gives every sprite a __dict__, so an attribute
+missing from __slots__ would not raise: it would quietly land in the
+instance dict. These tests set every attribute the classes assign and check
+that none of them does.
+"""
+import ast
+import inspect
+import os
+
+os.environ.setdefault('ARCADE_HEADLESS', '1')
+
+import arcade
+import pytest
+
+from entities import Enemy, Player
+
+
+def _assigned_attributes(cls) -> set:
+    """Names of every `self.<name>` assignment target in the class source."""
+    names = set()
+    for node in ast.walk(ast.parse(inspect.getsource(cls))):
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+            targets = [node.target]
+        else:
+            continue
+        for target in targets:
+            for sub in ast.walk(target):
+                if (isinstance(sub, ast.Attribute) and isinstance(sub.value, ast.Name)
+                        and sub.value.id == 'self'):
+                    names.add(sub.attr)
+    return names
+
+
+@pytest.mark.parametrize('cls', [Player, Enemy])
+def test_assigned_attributes_are_slotted(cls):
+    sprite = cls(100.0, 100.0)
+    base_fields = set(vars(arcade.SpriteSolidColor(4, 4, color=(0, 0, 0))))
+    
+    for name in sorted(_assigned_attributes(cls)):
+        try:
+            value = getattr(sprite, name)
+        except AttributeError:  # Slot only filled later in the game
+            value = None
+        setattr(sprite, name, value)
+    
+    assert set(vars(sprite)) == base_fields
+
+
+def test_source_scan_finds_fields():
+    # Guards the scan itself: an empty result would make the test above vacuous
+    assert {'path_waypoints', 'animated_sprite'} <= _assigned_attributes(Player)
+    assert {'_vision_angle', '_rng_idx'} <= _assigned_attributes(Enemy)
@@ -3,6 +3,7 @@ Utility functions for ray casting, collision detection, and game mechanics
 """
 import math
 import arcade
+import numpy as np
 from typing import List, Tuple, Optional
 
 
@@ -140,9 +141,34 @@ def has_line_of_sight(x1: float, y1: float, x2: float, y2: float,
     return True
 
 
+def build_obstacle_aabb(obstacles: List['Obstacle']) -> np.ndarray:
+    """
+    Pack obstacle bounds into an array for vectorized collision tests.
+    
+    Returns:
+        (N, 4) float32 array of (left, right, bottom, top)
+    """
+    return np.array(
+        [(obstacle.left, obstacle.right, obstacle.bottom, obstacle.top) for obstacle in obstacles],
+        dtype=np.float32
+    ).reshape(-1, 4)
+
+
 def get_distance(x1: float, y1: float, x2: float, y2: float) -> float:
-    """Calculate Euclidean distance between two points."""
-    return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+    """
+    Calculate Euclidean distance between two points.
+    
+    Only use it when the actual distance is needed; comparisons against a
+    radius should use get_distance_sq() and skip the square root.
+    """
+    return math.hypot(x2 - x1, y2 - y1)
+
+
+def get_distance_sq(x1: float, y1: float, x2: float, y2: float) -> float:
+    """Squared Euclidean distance, for comparisons against a squared radius."""
+    dx = x2 - x1
+    dy = y2 - y1
+    return dx * dx + dy * dy
 
 
 def get_angle_to_point(from_x: float, from_y: float, to_x: float, to_y: float) -> float:
@@ -197,18 +223,21 @@ def is_point_in_cone(point_x: float, point_y: float,
     Returns:
         True if point is in cone
     """
-    distance = get_distance(cone_x, cone_y, point_x, point_y)
-    if distance > max_distance:
+    dx = point_x - cone_x
+    dy = point_y - cone_y
+    dist_sq = dx * dx + dy * dy
+    if dist_sq > max_distance * max_distance:
         return False
     
-    angle_to_point = get_angle_to_point(cone_x, cone_y, point_x, point_y)
-    angle_diff = abs(angle_difference(cone_angle, angle_to_point))
-    
-    return angle_diff <= cone_fov / 2
+    # Angle test as a dot product with the facing direction (no atan2):
+    # angle to point <= fov / 2  <=>  cos(angle to point) >= cos(fov / 2)
+    angle_rad = math.radians(cone_angle)
+    dot = dx * math.cos(angle_rad) + dy * math.sin(angle_rad)
+    return dot >= math.cos(math.radians(cone_fov / 2)) * math.sqrt(dist_sq)
 
 
 def check_collision_circles(x1: float, y1: float, r1: float,
                            x2: float, y2: float, r2: float) -> bool:
     """Check collision between two circles."""
-    distance = get_distance(x1, y1, x2, y2)
-    return distance < (r1 + r2)
+    reach = r1 + r2
+    return get_distance_sq(x1, y1, x2, y2) < reach * reach
@@ -0,0 +1,229 @@
+"""
+Numba-compiled kernels for the game's numeric hot loops.
+
+Numba is optional: without it the kernels run as plain Python.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional: fall back to pure Python
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Slab-test tolerances, so a segment that only grazes a box still hits it, as
+# with the edge-by-edge test these kernels replace:
+# - GRAZE_EPS: slack on entry <= exit, in units of the segment parameter t (a
+#   ray through an exact corner has t_enter == t_exit, give or take rounding)
+# - PARALLEL_EPS: a segment moving less than this along an axis, in pixels, is
+#   parallel to it (cos(180 degrees) leaves a 1e-16 component that would push
+#   a ray running along a box edge off that edge)
+GRAZE_EPS = 1e-9
+PARALLEL_EPS = 1e-9
+
+
+def _sig(n_scalars: int) -> str:
+    """
+    Eager signature for a public kernel: n float64 scalars, then the (N, 4)
+    float32 obstacle bounds.
+
+    Explicit signatures compile (or load from the cache) at import instead of
+    on the first frame, and int arguments are converted to float64 rather
+    than triggering another specialization mid-game.
+    """
+    return '(' + 'f8, ' * n_scalars + 'f4[:, ::1])'
+
+
+@njit(inline='always', fastmath=True)
+def _clamp(value, low, high):
+    """Clamp as two independent selects, which compile to min/max without a branch."""
+    value = low if value < low else value
+    value = high if value > high else value
+    return value
+
+
+@njit(cache=True, fastmath=True)
+def _circle_hits_aabb(x, y, r2, aabb):
+    """True if the circle at (x, y) with squared radius r2 overlaps any box."""
+    for i in range(aabb.shape[0]):
+        closest_x = _clamp(x, aabb[i, 0], aabb[i, 1])
+        closest_y = _clamp(y, aabb[i, 2], aabb[i, 3])
+        ddx = x - closest_x
+        ddy = y - closest_y
+        if ddx * ddx + ddy * ddy < r2:
+            return True
+    return False
+
+
+if not NUMBA_AVAILABLE:
+    def _circle_hits_aabb(x, y, r2, aabb):
+        """Plain-Python fallback: one NumPy pass over the box columns, no loop."""
+        ddx = x - np.clip(x, aabb[:, 0], aabb[:, 1])
+        ddy = y - np.clip(y, aabb[:, 2], aabb[:, 3])
+        return bool(np.any(ddx * ddx + ddy * ddy < r2))
+
+
+@njit(_sig(9), cache=True, fastmath=True)
+def step_toward_nb(cx, cy, wx, wy, speed, radius, buffer, sw, sh, aabb):
+    """
+    Step a circle toward a waypoint and test the new position against walls.
+    
+    Args:
+        cx, cy: Current position
+        wx, wy: Waypoint
+        speed: Distance to cover
+        radius: Circle radius
+        buffer: Extra clearance kept from walls
+        sw, sh: Screen width and height
+        aabb: (N, 4) array of obstacle (left, right, bottom, top)
+    
+    Returns:
+        Tuple of (new_x, new_y, collided); the position is clamped to the screen
+    """
+    dx = wx - cx
+    dy = wy - cy
+    dist = math.sqrt(dx * dx + dy * dy)
+    if dist > 0.0:
+        scale = speed / dist
+        dx *= scale
+        dy *= scale
+    
+    new_x = _clamp(cx + dx, radius, sw - radius)
+    new_y = _clamp(cy + dy, radius, sh - radius)
+    r = radius + buffer
+    return new_x, new_y, _circle_hits_aabb(new_x, new_y, r * r, aabb)
+
+
+@njit(cache=True, fastmath=True)
+def _segment_boundary_t(x0, y0, dx, dy, left, right, bottom, top):
+    """
+    Slab test of the segment (x0, y0) + t * (dx, dy), t in [0, 1], against a box.
+    
+    Returns:
+        Smallest t where the segment crosses the box boundary, or -1.0 if it
+        never does (a segment entirely inside the box does not cross it)
+    """
+    t_enter = -1e30
+    t_exit = 1e30
+    if abs(dx) > PARALLEL_EPS:
+        t1 = (left - x0) / dx
+        t2 = (right - x0) / dx
+        t_enter = max(t_enter, min(t1, t2))
+        t_exit = min(t_exit, max(t1, t2))
+    elif x0 < left or x0 > right:
+        return -1.0
+    if abs(dy) > PARALLEL_EPS:
+        t1 = (bottom - y0) / dy
+        t2 = (top - y0) / dy
+        t_enter = max(t_enter, min(t1, t2))
+        t_exit = min(t_exit, max(t1, t2))
+    elif y0 < bottom or y0 > top:
+        return -1.0
+    
+    if t_enter > t_exit + GRAZE_EPS or t_exit < 0.0 or t_enter > 1.0:
+        return -1.0
+    if t_enter >= 0.0:
+        return t_enter
+    if t_exit <= 1.0:
+        return t_exit  # Starts inside the box: crosses on the way out
+    return -1.0
+
+
+@njit(_sig(4), cache=True, fastmath=True)
+def line_of_sight_nb(x0, y0, x1, y1, aabb):
+    """
+    True if the segment between two points crosses no obstacle boundary.
+    
+    Args:
+        x0, y0: First point
+        x1, y1: Second point
+        aabb: (N, 4) array of obstacle (left, right, bottom, top)
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    for i in range(aabb.shape[0]):
+        if _segment_boundary_t(x0, y0, dx, dy,
+                               aabb[i, 0], aabb[i, 1], aabb[i, 2], aabb[i, 3]) >= 0.0:
+            return False
+    return True
+
+
+@njit(_sig(5), cache=True, fastmath=True)
+def ray_distance_nb(x0, y0, dir_x, dir_y, max_distance, aabb):
+    """
+    Distance along a unit direction to the first obstacle boundary.
+    
+    Args:
+        x0, y0: Ray origin
+        dir_x, dir_y: Unit direction
+        max_distance: Ray length
+        aabb: (N, 4) array of obstacle (left, right, bottom, top)
+    
+    Returns:
+        Hit distance, or max_distance if nothing is hit
+    """
+    dx = dir_x * max_distance
+    dy = dir_y * max_distance
+    best = 1.0
+    for i in range(aabb.shape[0]):
+        t = _segment_boundary_t(x0, y0, dx, dy,
+                                aabb[i, 0], aabb[i, 1], aabb[i, 2], aabb[i, 3])
+        if 0.0 <= t < best:
+            best = t
+    return best * max_distance
+
+
+@njit('f8[::1](f8, f8, f8[::1], f8[::1], f8, f4[:, ::1])', cache=True, fastmath=True)
+def ray_distances_nb(x0, y0, dir_x, dir_y, max_distance, aabb):
+    """
+    ray_distance_nb() for a fan of rays sharing one origin.
+    
+    Args:
+        x0, y0: Ray origin
+        dir_x, dir_y: (R,) float64 arrays of unit directions
+        max_distance: Ray length
+        aabb: (N, 4) array of obstacle (left, right, bottom, top)
+    
+    Returns:
+        (R,) array of hit distances, max_distance where nothing is hit
+    """
+    distances = np.empty(dir_x.shape[0])
+    for k in range(dir_x.shape[0]):
+        distances[k] = ray_distance_nb(x0, y0, dir_x[k], dir_y[k], max_distance, aabb)
+    return distances
+
+
+if not NUMBA_AVAILABLE:
+    def ray_distances_nb(x0, y0, dir_x, dir_y, max_distance, aabb):
+        """Plain-Python fallback: slab test of every ray against every box in one NumPy pass."""
+        dx = (dir_x * max_distance)[:, None]
+        dy = (dir_y * max_distance)[:, None]
+        left, right, bottom, top = aabb.T.astype(np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tx1 = (left - x0) / dx
+            tx2 = (right - x0) / dx
+            ty1 = (bottom - y0) / dy
+            ty2 = (top - y0) / dy
+        # A ray parallel to a slab misses unless it starts between its sides
+        x_flat = np.abs(dx) <= PARALLEL_EPS
+        y_flat = np.abs(dy) <= PARALLEL_EPS
+        t_enter = np.maximum(np.where(x_flat, -1e30, np.minimum(tx1, tx2)),
+                             np.where(y_flat, -1e30, np.minimum(ty1, ty2)))
+        t_exit = np.minimum(np.where(x_flat, 1e30, np.maximum(tx1, tx2)),
+                            np.where(y_flat, 1e30, np.maximum(ty1, ty2)))
+        miss = ((x_flat & ((x0 < left) | (x0 > right)))
+                | (y_flat & ((y0 < bottom) | (y0 > top)))
+                | (t_enter > t_exit + GRAZE_EPS) | (t_exit < 0.0) | (t_enter > 1.0))
+        
+        # Same crossing rule as _segment_boundary_t: entry, else exit from inside
+        t = np.where(t_enter >= 0.0, t_enter, np.where(t_exit <= 1.0, t_exit, -1.0))
+        hit = ~miss & (t >= 0.0) & (t < 1.0)
+        return np.min(np.where(hit, t, 1.0), axis=1, initial=1.0) * max_distance